@@ -1,14 +1,22 @@
-import json
 import math
 import os
+from datetime import date
 
 import numpy as np
 import pandas as pd
 
+from elo_lib.fixtures import Fixtures
+from elo_lib.output import compress_outputs, write_csv, write_json
+from elo_lib.snapshot import write_snapshot
+from elo_lib.store import open_store
+from elo_lib.teams import TeamRegistry
+from elo_lib.utils import clean_name  # noqa: F401, re-exported for test_elo
 from elo_lib.utils import (
+    FIXTURES_FN,
     LATEST_ELOS_FN,
     RESULTS_ELOS_FN,
-    clean_name,
+    SNAPSHOT_FN,
+    TEAM_REGISTRY_FN,
     expected_result,
     revert_current_elo_to_mean,
 )
@@ -85,85 +93,81 @@ def calculate_elo(
     return [int(np.round(elo_new_home)), int(np.round(elo_new_away))]
 
 
-def handle_row(row, current_elo: dict):
+def replay_fixtures(
+    fixtures: Fixtures, current_elo: dict, games: np.ndarray = None
+) -> [np.ndarray, np.ndarray]:
     """
-    Get current elos for teams. Calculate elo changes from one fixture. Save those results and save
-    new currenty elo.
+    Replays played fixtures in order, all of them unless `games` picks which. Fills in the elo
+    columns of the fixtures, updates the current elo and returns the expected wins as
+    [<home expected wins>, <away expected wins>], NaN for fixtures that weren't replayed.
     """
-    # skip games that don't have scores yet
-    if "Final" not in row["time"]:
-        return row
-
-    home = row["home_team"]
-    away = row["away_team"]
-
-    # in case these are new teams
-    if home not in current_elo["teams"]:
-        current_elo["teams"][home] = 1300
-
-    if away not in current_elo["teams"]:
-        current_elo["teams"][away] = 1300
-
-    # if season changes revert to mean and update season
-    if row["season"] > current_elo["current_season"]:
-        current_elo = revert_current_elo_to_mean(current_elo, row["season"])
-
-    elif row["season"] < current_elo["current_season"]:
-        raise Exception("Games out of order.")
-
-    start_elo_home = current_elo["teams"][home]
-    start_elo_away = current_elo["teams"][away]
-
-    # how many times out of 100 would each team win
-    expected_win_home, expected_win_away = expected_result(start_elo_home, start_elo_away)
-
-    elo_new_home, elo_new_away = calculate_elo(
-        start_elo_home,
-        start_elo_away,
-        expected_win_home,
-        expected_win_away,
-        row["home_score"],
-        row["away_score"],
-    )
-
-    current_elo["teams"][home] = elo_new_home
-    current_elo["teams"][away] = elo_new_away
-
-    row["elo_after_home"] = elo_new_home
-    row["elo_after_away"] = elo_new_away
-
-    row["elo_before_home"] = start_elo_home
-    row["elo_before_away"] = start_elo_away
-
-    row["expected_win_home"] = expected_win_home
-    row["expected_win_away"] = expected_win_away
-
-    # update date of current elo to date of latest game, ie this row
-    current_elo["date"] = row["date"].strftime("%Y-%m-%d")
-    return row
-
-
-def structure_chartable_df(output_df: pd.DataFrame) -> pd.DataFrame:
-    # make df with all "after" elos over time so it's easier to work with
-
-    filtered_df = output_df[output_df["time"].str.contains("Final")]
-    after_elos_home_df = filtered_df[
-        [
-            "date",
-            "home_team",
-            "elo_after_home",
-        ]
-    ].rename(columns={"home_team": "team", "elo_after_home": "elo"})
-    after_elos_away_df = filtered_df[
-        [
-            "date",
-            "away_team",
-            "elo_after_away",
-        ]
-    ].rename(columns={"away_team": "team", "elo_after_away": "elo"})
-    after_elos_all = pd.concat([after_elos_home_df, after_elos_away_df])
-    after_elos_all = after_elos_all.sort_values("date")
-    return after_elos_all
+    expected_wins_home = np.full(len(fixtures), np.nan)
+    expected_wins_away = np.full(len(fixtures), np.nan)
+
+    # work with plain lists of ids, this is the hot loop
+    homes = fixtures.home.tolist()
+    aways = fixtures.away.tolist()
+    seasons = fixtures.season.tolist()
+    home_scores = fixtures.home_score.tolist()
+    away_scores = fixtures.away_score.tolist()
+
+    # ratings are kept by team id while replaying
+    team_ids = {name: team for team, name in enumerate(fixtures.teams.tolist())}
+    current_elo["teams"] = {team_ids[name]: elo for name, elo in current_elo["teams"].items()}
+
+    if games is None:
+        games = np.flatnonzero(fixtures.played)
+    for i in games.tolist():
+        home = homes[i]
+        away = aways[i]
+
+        # in case these are new teams
+        if home not in current_elo["teams"]:
+            current_elo["teams"][home] = 1300
+
+        if away not in current_elo["teams"]:
+            current_elo["teams"][away] = 1300
+
+        # if season changes revert to mean and update season
+        if seasons[i] > current_elo["current_season"]:
+            current_elo = revert_current_elo_to_mean(current_elo, seasons[i])
+
+        elif seasons[i] < current_elo["current_season"]:
+            raise Exception("Games out of order.")
+
+        start_elo_home = current_elo["teams"][home]
+        start_elo_away = current_elo["teams"][away]
+
+        # how many times out of 100 would each team win
+        expected_win_home, expected_win_away = expected_result(start_elo_home, start_elo_away)
+
+        elo_new_home, elo_new_away = calculate_elo(
+            start_elo_home,
+            start_elo_away,
+            expected_win_home,
+            expected_win_away,
+            home_scores[i],
+            away_scores[i],
+        )
+
+        current_elo["teams"][home] = elo_new_home
+        current_elo["teams"][away] = elo_new_away
+
+        fixtures.elo_after_home[i] = elo_new_home
+        fixtures.elo_after_away[i] = elo_new_away
+        fixtures.elo_before_home[i] = start_elo_home
+        fixtures.elo_before_away[i] = start_elo_away
+        expected_wins_home[i] = expected_win_home
+        expected_wins_away[i] = expected_win_away
+
+    # update date of current elo to date of latest game
+    if len(games):
+        current_elo["date"] = date.fromordinal(int(fixtures.date[games[-1]])).strftime("%Y-%m-%d")
+
+    current_elo["teams"] = {
+        str(fixtures.teams[team]): elo for team, elo in current_elo["teams"].items()
+    }
+    return [expected_wins_home, expected_wins_away]
 
 
 def get_earliest_season(input_data_df) -> int:
@@ -179,6 +183,7 @@ def handle(league):
     current_elo = {"date": None, "teams": dict()}
     output_path = os.path.join(league.elos_output_path, RESULTS_ELOS_FN)
     output_path_latest_elos = os.path.join(league.elos_output_path, LATEST_ELOS_FN)
+    output_path_fixtures = os.path.join(league.elos_output_path, FIXTURES_FN)
     input_path = os.path.join(league.clean_output_path, "league_all_results.csv")
     input_data_df = pd.read_csv(input_path)
     input_data_df["date"] = pd.to_datetime(input_data_df.date)
@@ -186,26 +191,38 @@ def handle(league):
     # sort by data just to be sure
     input_data_df = input_data_df.sort_values("date")
 
-    input_data_df["home_team"] = input_data_df["home_team"].apply(clean_name)
-    input_data_df["away_team"] = input_data_df["away_team"].apply(clean_name)
+    # encode once, every later step works with team ids
+    registry = TeamRegistry.from_league(league)
+    fixtures = Fixtures.from_frame(input_data_df, registry)
+    registry.save_cache(os.path.join(league.clean_output_path, TEAM_REGISTRY_FN))
+    input_data_df["home_team"] = fixtures.team_names(fixtures.home)
+    input_data_df["away_team"] = fixtures.team_names(fixtures.away)
 
-    # make empty columns for new data
-    input_data_df["elo_after_home"] = None
-    input_data_df["elo_after_away"] = None
-    input_data_df["elo_before_home"] = None
-    input_data_df["elo_before_away"] = None
-    input_data_df["expected_win_home"] = None
-    input_data_df["expected_win_away"] = None
+    current_elo["current_season"] = int(get_earliest_season(input_data_df))
 
-    current_elo["current_season"] = get_earliest_season(input_data_df)
+    expected_wins_home, expected_wins_away = replay_fixtures(fixtures, current_elo)
 
-    output_df = input_data_df.apply(handle_row, args=(current_elo,), axis=1)
+    # new columns are empty for games that haven't been played
+    played = fixtures.played
+    input_data_df["elo_after_home"] = np.where(played, fixtures.elo_after_home, np.nan)
+    input_data_df["elo_after_away"] = np.where(played, fixtures.elo_after_away, np.nan)
+    input_data_df["elo_before_home"] = np.where(played, fixtures.elo_before_home, np.nan)
+    input_data_df["elo_before_away"] = np.where(played, fixtures.elo_before_away, np.nan)
+    input_data_df["expected_win_home"] = expected_wins_home
+    input_data_df["expected_win_away"] = expected_wins_away
 
-    output_df.to_csv(os.path.join(output_path), index=False)
+    compress = compress_outputs(league)
+    write_csv(output_path, input_data_df, compress, index=False)
+    fixtures.save(output_path_fixtures)
 
     # save latest elos
-    with open(output_path_latest_elos, "w") as f:
-        json.dump(current_elo, f)
+    write_json(output_path_latest_elos, current_elo, compress)
+    write_snapshot(os.path.join(league.elos_output_path, SNAPSHOT_FN), current_elo)
+
+    store = open_store(league)
+    if store:
+        store.write(fixtures, current_elo, expected_wins_home, expected_wins_away)
+        store.close()
 
     print(output_path)
     # total_elo = 0
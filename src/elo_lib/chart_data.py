@@ -1,53 +1,173 @@
+import hashlib
 import json
-import math
 import os
+from datetime import date
 
+import numpy as np
 import pandas as pd
 
-from elo_lib.utils import CHART_DATA_FN, RESULTS_ELOS_FN, structure_chartable_df
+from elo_lib.fixtures import Fixtures
+from elo_lib.output import compress_outputs, dumps_json, write_bytes, write_json
+from elo_lib.season_stats import season_fingerprints
+from elo_lib.utils import CHART_DATA_FN, CHART_MANIFEST_FN, CHART_SHARDS_DIR, FIXTURES_FN
+
+CHART_DATE_FORMAT = "%Y-%m-%dT%H:%M:%S.%fZ"
+
+
+def chart_date(ordinal: int) -> str:
+    """
+    Formats a date ordinal the way the front end expects.
+    """
+    return date.fromordinal(int(ordinal)).strftime(CHART_DATE_FORMAT)
+
+
+def season_chart_data(fixtures: Fixtures, season: int) -> list[dict]:
+    """
+    Returns every team's elo after each game it played in a season, teams in alphabetical order.
+    """
+    games = np.flatnonzero(fixtures.played & (fixtures.season == season))
+
+    # every game appears once for the home team and once for the away team
+    teams = np.concatenate([fixtures.home[games], fixtures.away[games]])
+    elos = np.concatenate([fixtures.elo_after_home[games], fixtures.elo_after_away[games]])
+    dates = np.concatenate([fixtures.date[games], fixtures.date[games]])
+
+    season_data = []
+    for team in sorted(np.unique(teams), key=lambda team: fixtures.teams[team]):
+        team_games = np.flatnonzero(teams == team)
+        team_games = team_games[np.argsort(dates[team_games], kind="stable")]
+        season_data.append(
+            {
+                "team": str(fixtures.teams[team]),
+                "games": [
+                    {"date": chart_date(d), "elo": int(elo)}
+                    for d, elo in zip(dates[team_games].tolist(), elos[team_games].tolist())
+                ],
+                "season": str(season),
+            }
+        )
+    return season_data
+
+
+def chart_bounds(fixtures: Fixtures, games: np.ndarray) -> dict:
+    """
+    Returns the first and last dates and lowest and highest elos of a set of played games.
+    """
+    elos = np.concatenate([fixtures.elo_after_home[games], fixtures.elo_after_away[games]])
+    return {
+        "min_date": chart_date(fixtures.date[games].min()),
+        "max_date": chart_date(fixtures.date[games].max()),
+        "min_elo": int(elos.min()),
+        "max_elo": int(elos.max()),
+    }
+
+
+def write_shard(league, path: str, data) -> dict:
+    """
+    Writes one shard and returns its manifest entry, path relative to the chart data folder.
+    """
+    content = dumps_json(data)
+    write_bytes(path, content, compress_outputs(league))
+    return {
+        "path": os.path.relpath(path, league.chart_data_output_path),
+        "hash": hashlib.sha256(content).hexdigest(),
+    }
+
+
+def write_season_shards(league, fixtures: Fixtures, season: int, per_team: bool) -> dict:
+    """
+    Writes the chart data of one season, and of each of its teams with per_team. Returns the
+    season's manifest entry.
+    """
+    shards_path = os.path.join(league.chart_data_output_path, CHART_SHARDS_DIR)
+    season_data = season_chart_data(fixtures, season)
+    games = np.flatnonzero(fixtures.played & (fixtures.season == season))
+
+    shard = write_shard(
+        league,
+        os.path.join(shards_path, f"season_{season}.json"),
+        {"season": str(season), "data": season_data},
+    )
+    shard.update(chart_bounds(fixtures, games))
+    if per_team:
+        shard["teams"] = {
+            team_data["team"]: write_shard(
+                league,
+                os.path.join(shards_path, f"season_{season}_{team_data['team']}.json"),
+                team_data,
+            )
+            for team_data in season_data
+        }
+    return shard
+
+
+def shard_exists(league, shard: dict, per_team: bool) -> bool:
+    """
+    Checks that every file of a manifest entry is still there.
+    """
+    if per_team != ("teams" in shard):
+        return False
+    paths = [shard["path"]] + [team["path"] for team in shard.get("teams", dict()).values()]
+    return all(os.path.exists(os.path.join(league.chart_data_output_path, p)) for p in paths)
+
+
+def handle_sharded(league, per_team: bool = False) -> str:
+    """
+    Creates one chart data file per season, and per team with per_team, plus a manifest of the
+    files, their hashes and the dates and elos the chart needs to be drawn. Seasons whose games
+    haven't changed since the last run are left alone, so usually only the current season is
+    rewritten.
+    """
+    fixtures = Fixtures.load(os.path.join(league.elos_output_path, FIXTURES_FN))
+    manifest_path = os.path.join(league.chart_data_output_path, CHART_MANIFEST_FN)
+    os.makedirs(os.path.join(league.chart_data_output_path, CHART_SHARDS_DIR), exist_ok=True)
+
+    previous_shards = dict()
+    if os.path.exists(manifest_path):
+        with open(manifest_path, "r") as f:
+            previous_shards = json.load(f)["shards"]
+
+    fingerprints = season_fingerprints(fixtures)
+    shards = dict()
+    for season in pd.unique(fixtures.season[fixtures.played]):
+        shard = previous_shards.get(str(season))
+        if (
+            shard is None
+            or shard["fingerprint"] != fingerprints[str(season)]
+            or not shard_exists(league, shard, per_team)
+        ):
+            shard = write_season_shards(league, fixtures, int(season), per_team)
+            shard["fingerprint"] = fingerprints[str(season)]
+        shards[str(season)] = shard
+
+    manifest = {
+        "min_date": min(shard["min_date"] for shard in shards.values()),
+        "max_date": max(shard["max_date"] for shard in shards.values()),
+        "min_elo": min(shard["min_elo"] for shard in shards.values()),
+        "max_elo": max(shard["max_elo"] for shard in shards.values()),
+        "shards": shards,
+    }
+    write_json(manifest_path, manifest, compress_outputs(league))
+    return manifest_path
 
 
 def handle(league) -> str:
     """
     Creates a json data file of every date and elo that can be used to create a chart of Elos.
+    With "chart_shards" set to "season" or "team" in the config, writes shards and a manifest
+    instead, see `handle_sharded`.
     """
+    chart_shards = getattr(league, "chart_shards", None)
+    if chart_shards:
+        return handle_sharded(league, per_team=chart_shards == "team")
 
-    wphl_elos_df = pd.read_csv(
-        os.path.join(league.elos_output_path, RESULTS_ELOS_FN),
-        header=0,
-        parse_dates=["date"],  # input here should be that latest file
-    )
+    fixtures = Fixtures.load(os.path.join(league.elos_output_path, FIXTURES_FN))
     output_path = os.path.join(league.chart_data_output_path, CHART_DATA_FN)
 
     # get max dates and elos from games played
-    games_played = wphl_elos_df[wphl_elos_df["time"].str.lower().str.contains("final")]
-    max_date = max(games_played.date).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
-    min_date = min(games_played.date).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
-
-    min_elo = int(min(pd.concat([games_played.elo_after_home, games_played.elo_after_away])))
-    max_elo = int(max(pd.concat([games_played.elo_after_home, games_played.elo_after_away])))
-
-    export_data = {
-        "data": [],
-        "min_date": min_date,
-        "max_date": max_date,
-        "min_elo": min_elo,
-        "max_elo": max_elo,
-    }
-    for season in wphl_elos_df.season.unique():
-        season_data = wphl_elos_df[wphl_elos_df["season"] == season]
-        chartable_df = structure_chartable_df(season_data)
-        chartable_df.index = chartable_df.index.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
-        chartable_dict = chartable_df.to_dict(orient="dict", index=True)
-
-        # structure data in easier to visualize format
-        for team in chartable_dict:
-            team_data = {"team": team, "games": [], "season": str(season)}
-            for k, v in chartable_dict[team].items():
-                if not math.isnan(v):
-                    team_data["games"].append({"date": k, "elo": int(v)})
-            export_data["data"].append(team_data)
-
-    with open(output_path, "w") as f:
-        json.dump(export_data, f)
+    export_data = {"data": [], **chart_bounds(fixtures, np.flatnonzero(fixtures.played))}
+    for season in pd.unique(fixtures.season):
+        export_data["data"].extend(season_chart_data(fixtures, int(season)))
+
+    write_json(output_path, export_data, compress_outputs(league))
     return output_path
@@ -3,6 +3,8 @@ import os
 
 import pandas as pd
 
+from elo_lib.output import compress_outputs, write_csv
+
 key_cols_map = {
     "game_status": "time",
     "home_team_city": "home_team",
@@ -64,5 +66,11 @@ def handle(league) -> str:
         season_df = clean_season(file_data, seasonid, league)
         all_seasons_df = pd.concat([all_seasons_df, season_df])
 
-    all_seasons_df[use_cols].to_csv(output_path, index=False, date_format="%Y/%m/%d")
+    write_csv(
+        output_path,
+        all_seasons_df[use_cols],
+        compress_outputs(league),
+        index=False,
+        date_format="%Y/%m/%d",
+    )
     return output_path
@@ -1,11 +1,19 @@
+import asyncio
+import json
+
 import click
 
 from elo_lib.calculate_elo import handle as handle_calculate_elo
 from elo_lib.chart_data import handle as handle_chart_data
 from elo_lib.clean_seasons import handle as handle_clean_seasons
 from elo_lib.get_season import handle as handle_get_season
+from elo_lib.scenario import ScenarioEngine
+from elo_lib.scorelines import handle as handle_scorelines
+from elo_lib.season_stats import handle as handle_season_stats
+from elo_lib.uncertainty import handle as handle_uncertainty
 from elo_lib.upcoming_projection import handle as handle_projection
 from elo_lib.utils import League
+from elo_lib.watch import watch as watch_season
 
 
 @click.group()
@@ -52,6 +60,47 @@ def projections(config):
     print(new_file)
 
 
+@click.command()
+@click.option(
+    "--config",
+    default="league.config",
+    help="Path to config file containing paths and data about seasons.",
+)
+def scorelines(config):
+    """Projects score, margin and overtime chances for every fixture not played yet."""
+    league = League(config=config)
+    new_file = handle_scorelines(league)
+    click.echo(new_file)
+
+
+# run like `elolib scenario --game boston toronto 3 0 --game ottawa montreal 1 2`
+@click.command()
+@click.option(
+    "--config",
+    default="league.config",
+    help="Path to config file containing paths and data about seasons.",
+)
+@click.option(
+    "--game",
+    "games",
+    nargs=4,
+    multiple=True,
+    type=(str, str, int, int),
+    help="Hypothetical game as HOME AWAY HOME_SCORE AWAY_SCORE. Can be repeated.",
+)
+def scenario(config, games):
+    """Shows how Elos and next fixtures' odds change if hypothetical games are played."""
+    league = League(config=config)
+    engine = ScenarioEngine.from_league(league)
+    result = engine.run(
+        [
+            {"home": home, "away": away, "home_score": home_score, "away_score": away_score}
+            for home, away, home_score, away_score in games
+        ]
+    )
+    click.echo(json.dumps(result, indent=2, ensure_ascii=False))
+
+
 # like elolib chartable --input ../data/output/all_results/wphl_elos_2024-11-24_19:37:35.csv /
 # --output-dir ../data/output
 @click.command()
@@ -60,13 +109,49 @@ def projections(config):
     default="league.config",
     help="Path to config file containing paths and data about seasons.",
 )
-def chartable(config):
+@click.option(
+    "--shards",
+    type=click.Choice(["season", "team"]),
+    help="Write one file per season, or per season and team, plus a manifest.",
+)
+def chartable(config, shards):
     """Creates a json file of each team's Elo over time, suitable for a line chart."""
     league = League(config=config)
+    if shards:
+        league.chart_shards = shards
     new_file = handle_chart_data(league)
     click.echo(new_file)
 
 
+@click.command()
+@click.option(
+    "--config",
+    default="league.config",
+    help="Path to config file containing paths and data about seasons.",
+)
+def stats(config):
+    """Creates a json file of each team's record, goals and Elo movement for every season."""
+    league = League(config=config)
+    new_file = handle_season_stats(league)
+    click.echo(new_file)
+
+
+@click.command()
+@click.option(
+    "--config",
+    default="league.config",
+    help="Path to config file containing paths and data about seasons.",
+)
+@click.option("--replicas", default=500, help="Number of bootstrapped replays.")
+@click.option("--workers", type=int, help="Number of processes to run replays in.")
+@click.option("--interval", default=90.0, help="Width of the intervals, in percent.")
+def uncertainty(config, replicas, workers, interval):
+    """Creates a json file of each team's Elo and next games' odds with bootstrapped intervals."""
+    league = League(config=config)
+    new_file = handle_uncertainty(league, replicas=replicas, workers=workers, interval=interval)
+    click.echo(new_file)
+
+
 @click.command()
 @click.argument("seasonid")
 @click.option(
@@ -82,6 +167,20 @@ def getseason(seasonid, config, output_path):
     print(new_file)
 
 
+@click.command()
+@click.argument("seasonid")
+@click.option(
+    "--config",
+    default="league.config",
+    help="Path to config file containing paths and data about seasons.",
+)
+@click.option("--interval", default=60.0, help="Seconds to wait between polls of the feed.")
+def watch(seasonid, config, interval):
+    """Polls season SEASONID and updates Elos, projections and charts as games finish."""
+    league = League(config=config)
+    asyncio.run(watch_season(seasonid, league, interval=interval))
+
+
 @click.command()
 @click.option(
     "--config",
@@ -112,7 +211,12 @@ def cleandata(config):
 cli.add_command(hi)
 cli.add_command(calculate)
 cli.add_command(projections)
+cli.add_command(scenario)
+cli.add_command(scorelines)
 cli.add_command(chartable)
+cli.add_command(stats)
+cli.add_command(uncertainty)
 cli.add_command(getseason)
+cli.add_command(watch)
 cli.add_command(getallseasons)
 cli.add_command(cleandata)
@@ -0,0 +1,133 @@
+import io
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from elo_lib.output import write_bytes
+from elo_lib.teams import TeamRegistry
+
+# ordinal of 1970-01-01 so numpy's days since epoch can be turned into date ordinals
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def date_ordinals(dates: pd.Series) -> np.ndarray:
+    """
+    Takes a column of datetimes and returns them as date ordinals.
+    """
+    days = dates.to_numpy().astype("datetime64[D]").astype(np.int64)
+    return (days + EPOCH_ORDINAL).astype(np.int32)
+
+
+def intern(values: pd.Series) -> [np.ndarray, np.ndarray]:
+    """
+    Takes a column of strings and returns [<codes>, <table of unique strings>].
+    """
+    codes, uniques = pd.factorize(values.fillna(""))
+    return codes.astype(np.int16), np.asarray(uniques, dtype=str)
+
+
+class Fixtures:
+    """
+    Class to hold every fixture of a league as contiguous arrays, one element per fixture. Team,
+    venue and fixture type strings are interned once into the `teams`, `venues` and `types`
+    tables so later stages only work with integer ids.
+
+    The elo columns are 0 until ratings have been calculated and stay 0 for unplayed fixtures.
+    """
+
+    arrays = {
+        "date": np.int32,
+        "season": np.int16,
+        "type": np.int16,
+        "venue": np.int16,
+        "home": np.int16,
+        "away": np.int16,
+        "home_score": np.int8,
+        "away_score": np.int8,
+        "played": np.bool_,
+        "elo_before_home": np.int16,
+        "elo_before_away": np.int16,
+        "elo_after_home": np.int16,
+        "elo_after_away": np.int16,
+    }
+    tables = ["teams", "types", "venues"]
+
+    __slots__ = list(arrays) + tables
+
+    def __init__(self, **kwargs):
+        size = len(kwargs["date"])
+        for name, dtype in self.arrays.items():
+            value = kwargs.get(name)
+            if value is None:
+                value = np.zeros(size, dtype=dtype)
+            setattr(self, name, np.ascontiguousarray(value, dtype=dtype))
+        for name in self.tables:
+            setattr(self, name, np.asarray(kwargs[name], dtype=str))
+
+    def __len__(self) -> int:
+        return len(self.date)
+
+    @classmethod
+    def from_frame(cls, results_df: pd.DataFrame, registry: TeamRegistry = None):
+        """
+        Encodes a df of results, like the output of `cleandata`, into fixtures. Rows keep their
+        order so fixture i is row i of the df.
+        """
+        if registry is None:
+            registry = TeamRegistry()
+        # both columns at once so every unknown team is reported together
+        teams = registry.encode(pd.concat([results_df["home_team"], results_df["away_team"]]))
+        home, away = np.split(teams, [len(results_df)])
+        types, type_table = intern(results_df["type"])
+        venues, venue_table = intern(results_df["venue"])
+        return cls(
+            date=date_ordinals(pd.to_datetime(results_df["date"])),
+            season=results_df["season"].to_numpy(),
+            type=types,
+            venue=venues,
+            home=home,
+            away=away,
+            home_score=results_df["home_score"].fillna(0).to_numpy(),
+            away_score=results_df["away_score"].fillna(0).to_numpy(),
+            played=results_df["time"].str.contains("Final").to_numpy(dtype=bool),
+            teams=registry.names,
+            types=type_table,
+            venues=venue_table,
+        )
+
+    def copy(self):
+        """
+        Returns fixtures with copies of every array, changing them leaves these fixtures alone.
+        """
+        return Fixtures(**{name: getattr(self, name).copy() for name in self.__slots__})
+
+    @classmethod
+    def load(cls, path: str):
+        """
+        Reads fixtures saved with `save`.
+        """
+        with np.load(path) as data:
+            return cls(**{name: data[name] for name in data.files})
+
+    def save(self, path: str) -> bool:
+        """
+        Saves every array and table into one uncompressed .npz file. Returns whether the file
+        changed.
+        """
+        npz = io.BytesIO()
+        np.savez(npz, **{name: getattr(self, name) for name in self.__slots__})
+        return write_bytes(path, npz.getvalue())
+
+    def team_names(self, team_ids: np.ndarray) -> np.ndarray:
+        """
+        Turns an array of team ids back into names.
+        """
+        return self.teams[team_ids]
+
+    def team_ratings(self, teams: dict) -> np.ndarray:
+        """
+        Takes a dict of ratings by team name, like `latest_elos.json`'s "teams", and returns them as
+        an array indexed by team id. Teams without a rating get 1300.
+        """
+        return np.array([teams.get(name, 1300) for name in self.teams], dtype=np.int64)
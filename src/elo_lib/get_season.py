@@ -1,7 +1,8 @@
-import json
 import os
 import requests
 
+from elo_lib.output import write_json
+
 params = {
     "feed": "modulekit",
     "view": "schedule",
@@ -35,6 +36,29 @@ def drill_down(keys: list[str], data) -> dict:
     return current
 
 
+def fetch_season(seasonid, league) -> list:
+    """
+    Gets all matches of a season from the url specified in config object.
+    """
+    url = league.url
+    if league.url_contains_id:  # ex: nwsl
+        url = insert_seasonid(seasonid, url)
+    elif league.param_id:  # ex: wphl
+        params["season_id"] = seasonid
+
+    r = requests.get(url, params=league.params)
+    r.raise_for_status()
+    data = r.json()
+    return drill_down(league.matches_path, data)
+
+
+def season_path(seasonid, league) -> str:
+    """
+    Where the data of a season is saved.
+    """
+    return os.path.join(league.output_path, f"season_{seasonid}.json")
+
+
 def handle(seasonid, league):
     """
     Gets all data for a season based on its id. Gets data from url specified in config object and
@@ -45,18 +69,8 @@ def handle(seasonid, league):
         `param_id
 
     """
-    url = league.url
-    if league.url_contains_id:  # ex: nwsl
-        url = insert_seasonid(seasonid, url)
-    elif league.param_id:  # ex: wphl
-        params["season_id"] = seasonid
+    output_path = season_path(seasonid, league)
 
-    r = requests.get(url, params=league.params)
-    data = r.json()
-    fn = f"season_{seasonid}.json"
-    output_path = os.path.join(league.output_path, fn)
-    
-    matches = drill_down(league.matches_path, data)
-    with open(output_path, "w") as f:
-        json.dump(matches, f)
+    matches = fetch_season(seasonid, league)
+    write_json(output_path, matches)
     return output_path
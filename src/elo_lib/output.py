@@ -0,0 +1,84 @@
+import gzip
+import hashlib
+import json
+import os
+import uuid
+
+import pandas as pd
+
+
+def compress_outputs(league) -> bool:
+    """
+    Whether a league's config asks for a gzipped copy of every output, for static serving.
+    """
+    return getattr(league, "compress_outputs", False)
+
+
+def dumps_json(data) -> bytes:
+    """
+    Serializes data as compact utf-8 json.
+    """
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def file_hash(path: str) -> str:
+    """
+    Returns the sha256 of a file, None if it doesn't exist.
+    """
+    if not os.path.exists(path):
+        return None
+    file_sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            file_sha.update(chunk)
+    return file_sha.hexdigest()
+
+
+def replace_file(path: str, data: bytes) -> None:
+    """
+    Writes data to a temp file next to path and renames it over path, so readers only ever see the
+    old or the new file.
+    """
+    temp_path = os.path.join(
+        os.path.dirname(path), f".{os.path.basename(path)}.{uuid.uuid4().hex}.tmp"
+    )
+    # os.open so the new file gets the usual permissions instead of a temp file's 0600
+    fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def write_bytes(path: str, data: bytes, compress: bool = False) -> bool:
+    """
+    Atomically writes data to path unless path already holds exactly that data. With compress, also
+    keeps a gzipped copy at path + ".gz". Returns whether path was written.
+    """
+    written = file_hash(path) != hashlib.sha256(data).hexdigest()
+    if written:
+        replace_file(path, data)
+    if compress and (written or not os.path.exists(f"{path}.gz")):
+        # mtime=0 so the same data always compresses to the same bytes
+        replace_file(f"{path}.gz", gzip.compress(data, mtime=0))
+    return written
+
+
+def write_json(path: str, data, compress: bool = False) -> bool:
+    """
+    Atomically writes data as compact json. See `write_bytes`.
+    """
+    return write_bytes(path, dumps_json(data), compress)
+
+
+def write_csv(path: str, df: pd.DataFrame, compress: bool = False, **kwargs) -> bool:
+    """
+    Atomically writes a df as csv, kwargs go to `DataFrame.to_csv`. See `write_bytes`.
+    """
+    return write_bytes(path, df.to_csv(**kwargs).encode(), compress)
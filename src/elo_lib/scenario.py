@@ -0,0 +1,100 @@
+import json
+import os
+from collections import ChainMap
+
+import pandas as pd
+
+from elo_lib.fixtures import Fixtures
+from elo_lib.store import open_store
+from elo_lib.teams import TeamRegistry
+from elo_lib.upcoming_projection import next_fixtures, project_games
+from elo_lib.utils import FIXTURES_FN, LATEST_ELOS_FN, calculate_elo, expected_result
+
+
+class ScenarioEngine:
+    """
+    Class to hold the latest elos and the next fixtures in memory so hypothetical results can be
+    applied without touching disk. Each scenario writes its elos to its own overlay on top of the
+    latest elos, which are never changed.
+    """
+
+    def __init__(self, latest_elos: dict, upcoming: list[dict], registry: TeamRegistry = None):
+        self.latest_elos = latest_elos
+        self.upcoming = upcoming
+        self.registry = registry if registry is not None else TeamRegistry()
+
+    @classmethod
+    def from_league(cls, league, n: int = 5):
+        """
+        Loads the latest elos and the next n fixtures of a league.
+        """
+        store = open_store(league)
+        if store:
+            latest_elos = store.latest_elos()
+            upcoming = store.unplayed(n)
+            store.close()
+        else:
+            with open(os.path.join(league.elos_output_path, LATEST_ELOS_FN), "r") as f:
+                latest_elos = json.load(f)
+            fixtures = Fixtures.load(os.path.join(league.elos_output_path, FIXTURES_FN))
+            upcoming = next_fixtures(fixtures, n)
+        return cls(latest_elos, upcoming, TeamRegistry.from_league(league))
+
+    def teams(self, games: list[dict]) -> list[[str, str]]:
+        """
+        Returns the canonical home and away team of each game. Names that were already resolved
+        are a dict lookup. Raises one exception listing every team that doesn't have an elo.
+        """
+        names = [game[side] for game in games for side in ["home", "away"]]
+        new_names = [name for name in names if name not in self.registry.resolved]
+        if new_names:
+            self.registry.resolve(pd.Series(new_names))
+        teams = [self.registry.resolved[name] for name in names]
+        unknown = {
+            name for name, team in zip(names, teams) if team not in self.latest_elos["teams"]
+        }
+        if unknown:
+            raise Exception(
+                "Unknown teams, they don't have an elo: "
+                + ", ".join(sorted(repr(name) for name in unknown))
+            )
+        return list(zip(teams[::2], teams[1::2]))
+
+    def run(self, games: list[dict]) -> dict:
+        """
+        Applies hypothetical games, in order, on top of the latest elos. Each game is a dict with
+        "home", "away", "home_score" and "away_score". Returns the new elos and the change for every
+        team that played, and the projections of the next fixtures with the new elos.
+        """
+        new_elos = dict()
+        elos = ChainMap(new_elos, self.latest_elos["teams"])
+        for game, (home, away) in zip(games, self.teams(games)):
+            if game["home_score"] == game["away_score"]:
+                raise Exception("Games can't end in a tie.")
+            if home == away:
+                raise Exception(f"{game['home']} can't play itself.")
+            start_elo_home = elos[home]
+            start_elo_away = elos[away]
+            expected_win_home, expected_win_away = expected_result(start_elo_home, start_elo_away)
+            elos[home], elos[away] = calculate_elo(
+                start_elo_home,
+                start_elo_away,
+                expected_win_home,
+                expected_win_away,
+                game["home_score"],
+                game["away_score"],
+            )
+
+        return {
+            "elos": new_elos,
+            "changes": {
+                team: elo - self.latest_elos["teams"][team] for team, elo in new_elos.items()
+            },
+            "projections": project_games(self.upcoming, elos),
+        }
+
+    def run_many(self, scenarios: list[list[dict]]) -> list[dict]:
+        """
+        Runs each scenario independently from the latest elos.
+        """
+        return [self.run(games) for games in scenarios]
@@ -0,0 +1,151 @@
+import json
+import os
+from datetime import date
+from functools import lru_cache
+from math import lgamma
+
+import numpy as np
+
+from elo_lib.fixtures import Fixtures
+from elo_lib.output import compress_outputs, write_json
+from elo_lib.utils import FIXTURES_FN, HOME_ADVANTAGE, LATEST_ELOS_FN, SCORELINES_FN
+
+# goals per team per game when there aren't any results to take it from
+DEFAULT_GOALS_PER_TEAM = 2.8
+# elo difference that makes one team's expected goals 10x the other's. 1600 makes win odds from
+# scorelines line up with `expected_result` at ~2.8 goals per team
+GOAL_SCALE = 1600
+# expected goals are rounded to this step to look up their probabilities
+RATE_STEP = 0.05
+MAX_RATE = 12.0
+# the last column of the table is the chance of this many goals or more
+MAX_GOALS = 12
+MAX_MARGIN = 5
+
+
+@lru_cache(maxsize=None)
+def poisson_table() -> np.ndarray:
+    """
+    Returns the Poisson probability of 0..MAX_GOALS goals for every expected goals on the grid, as
+    a (rates, MAX_GOALS + 1) array. Built once and reused.
+    """
+    rates = np.arange(0, MAX_RATE + RATE_STEP / 2, RATE_STEP)[:, None]
+    goals = np.arange(MAX_GOALS + 1)[None, :]
+    log_factorials = np.array([lgamma(g + 1) for g in range(MAX_GOALS + 1)])[None, :]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        table = np.exp(goals * np.log(rates) - rates - log_factorials)
+    table[0] = 0
+    table[0, 0] = 1
+    table[:, -1] += 1 - table.sum(axis=1)
+    table.setflags(write=False)
+    return table
+
+
+def expected_goals(
+    elos_home: np.ndarray, elos_away: np.ndarray, goals_per_team: float
+) -> [np.ndarray, np.ndarray]:
+    """
+    Maps elo differences to each side's expected goals, rounded to the table's grid.
+    """
+    supremacy = (np.asarray(elos_home) + HOME_ADVANTAGE - np.asarray(elos_away)) / GOAL_SCALE
+    goals_home = goals_per_team * 10**supremacy
+    goals_away = goals_per_team * 10**-supremacy
+    return [
+        np.clip(np.rint(goals / RATE_STEP), 0, len(poisson_table()) - 1) * RATE_STEP
+        for goals in [goals_home, goals_away]
+    ]
+
+
+def scoreline_probabilities(goals_home: np.ndarray, goals_away: np.ndarray) -> np.ndarray:
+    """
+    Returns the chance of every scoreline of every game as a (games, home goals, away goals) array.
+    """
+    table = poisson_table()
+    home = table[np.rint(goals_home / RATE_STEP).astype(int)]
+    away = table[np.rint(goals_away / RATE_STEP).astype(int)]
+    return home[:, :, None] * away[:, None, :]
+
+
+def project_scorelines(
+    elos_home: np.ndarray, elos_away: np.ndarray, goals_per_team: float = DEFAULT_GOALS_PER_TEAM
+) -> dict:
+    """
+    Projects regulation results for a whole list of games at once. Returns arrays of expected goals,
+    regulation win and tie (overtime) chances, the chance of each home margin from -MAX_MARGIN to
+    MAX_MARGIN and each game's most likely score.
+    """
+    goals_home, goals_away = expected_goals(elos_home, elos_away, goals_per_team)
+    scorelines = scoreline_probabilities(goals_home, goals_away)
+    margins = np.arange(-MAX_MARGIN, MAX_MARGIN + 1)
+    most_likely = scorelines.reshape(len(scorelines), (MAX_GOALS + 1) ** 2).argmax(axis=1)
+    return {
+        "goals_home": goals_home,
+        "goals_away": goals_away,
+        # home goals are rows, so home wins are below the diagonal
+        "win_home": np.tril(scorelines, -1).sum(axis=(1, 2)),
+        "win_away": np.triu(scorelines, 1).sum(axis=(1, 2)),
+        "overtime": np.trace(scorelines, axis1=1, axis2=2),
+        "margins": np.stack(
+            [np.trace(scorelines, offset=-margin, axis1=1, axis2=2) for margin in margins], axis=1
+        ),
+        "most_likely_home": most_likely // (MAX_GOALS + 1),
+        "most_likely_away": most_likely % (MAX_GOALS + 1),
+    }
+
+
+def average_goals_per_team(fixtures: Fixtures) -> float:
+    """
+    Average goals scored per team per game so far.
+    """
+    played = fixtures.played
+    if not played.any():
+        return DEFAULT_GOALS_PER_TEAM
+    home_goals = fixtures.home_score[played].sum(dtype=np.int64)
+    away_goals = fixtures.away_score[played].sum(dtype=np.int64)
+    return float((home_goals + away_goals) / (2 * played.sum()))
+
+
+def handle(league) -> str:
+    """
+    Creates a json file of the projected scorelines of every fixture that hasn't been played yet.
+    """
+    output_path = os.path.join(league.projections_output_path, SCORELINES_FN)
+    fixtures = Fixtures.load(os.path.join(league.elos_output_path, FIXTURES_FN))
+    with open(os.path.join(league.elos_output_path, LATEST_ELOS_FN), "r") as f:
+        latest_elos = json.load(f)
+
+    unplayed = np.flatnonzero(~fixtures.played)
+    unplayed = unplayed[np.argsort(fixtures.date[unplayed], kind="stable")]
+    ratings = fixtures.team_ratings(latest_elos["teams"])
+    projection = project_scorelines(
+        ratings[fixtures.home[unplayed]],
+        ratings[fixtures.away[unplayed]],
+        average_goals_per_team(fixtures),
+    )
+
+    games = []
+    for i, fixture in enumerate(unplayed.tolist()):
+        games.append(
+            {
+                "date": date.fromordinal(int(fixtures.date[fixture])).strftime("%b. %d, %Y"),
+                "away_team": str(fixtures.teams[fixtures.away[fixture]]),
+                "home_team": str(fixtures.teams[fixtures.home[fixture]]),
+                "expected_goals_home": round(float(projection["goals_home"][i]), 2),
+                "expected_goals_away": round(float(projection["goals_away"][i]), 2),
+                "win_home": float(projection["win_home"][i]),
+                "win_away": float(projection["win_away"][i]),
+                "overtime": float(projection["overtime"][i]),
+                "margins": {
+                    str(margin): float(p)
+                    for margin, p in zip(
+                        range(-MAX_MARGIN, MAX_MARGIN + 1), projection["margins"][i].tolist()
+                    )
+                },
+                "most_likely_score": (
+                    f"{projection['most_likely_home'][i]}-{projection['most_likely_away'][i]}"
+                ),
+            }
+        )
+
+    write_json(output_path, games, compress_outputs(league))
+    return output_path
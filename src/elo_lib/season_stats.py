@@ -0,0 +1,138 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from elo_lib.fixtures import Fixtures
+from elo_lib.output import compress_outputs, write_json
+from elo_lib.utils import FIXTURES_FN, SEASON_STATS_FN
+
+
+def season_fingerprints(fixtures: Fixtures) -> dict:
+    """
+    Returns a hash of every season's played games and elos. A season only needs its stats
+    recalculated when its hash changes.
+    """
+    # ids are hashed as the names they point to, so teams showing up in other seasons don't change
+    # a season's hash
+    interned = {
+        "home": fixtures.teams,
+        "away": fixtures.teams,
+        "type": fixtures.types,
+        "venue": fixtures.venues,
+    }
+    fingerprints = dict()
+    for season in pd.unique(fixtures.season):
+        games = fixtures.played & (fixtures.season == season)
+        season_hash = hashlib.md5()
+        for name in Fixtures.arrays:
+            values = getattr(fixtures, name)[games]
+            if name in interned:
+                season_hash.update("|".join(interned[name][values]).encode())
+            else:
+                season_hash.update(values.tobytes())
+        fingerprints[str(season)] = season_hash.hexdigest()
+    return fingerprints
+
+
+def team_games_df(fixtures: Fixtures, seasons: list[int]) -> pd.DataFrame:
+    """
+    Returns one row per team per played game of the given seasons, in the order games were played.
+    """
+    games = np.flatnonzero(fixtures.played & np.isin(fixtures.season, seasons))
+    home = pd.DataFrame(
+        {
+            "game": games,
+            "season": fixtures.season[games],
+            "team": fixtures.home[games],
+            "goals_for": fixtures.home_score[games].astype(np.int64),
+            "goals_against": fixtures.away_score[games].astype(np.int64),
+            "elo_before": fixtures.elo_before_home[games],
+            "elo_after": fixtures.elo_after_home[games],
+        }
+    )
+    away = pd.DataFrame(
+        {
+            "game": games,
+            "season": fixtures.season[games],
+            "team": fixtures.away[games],
+            "goals_for": fixtures.away_score[games].astype(np.int64),
+            "goals_against": fixtures.home_score[games].astype(np.int64),
+            "elo_before": fixtures.elo_before_away[games],
+            "elo_after": fixtures.elo_after_away[games],
+        }
+    )
+    team_games = pd.concat([home, away], ignore_index=True).sort_values("game", kind="stable")
+    team_games["win"] = team_games["goals_for"] > team_games["goals_against"]
+    team_games["loss"] = team_games["goals_for"] < team_games["goals_against"]
+    team_games["tie"] = team_games["goals_for"] == team_games["goals_against"]
+    return team_games
+
+
+def calculate_season_stats(fixtures: Fixtures, seasons: list[int]) -> dict:
+    """
+    Aggregates every team's line for the given seasons in one grouped pass. Returns
+    {<season>: {<team>: <season line>}}.
+    """
+    team_games = team_games_df(fixtures, seasons)
+    stats_df = team_games.groupby(["season", "team"], sort=False).agg(
+        games=("game", "size"),
+        wins=("win", "sum"),
+        losses=("loss", "sum"),
+        ties=("tie", "sum"),
+        goals_for=("goals_for", "sum"),
+        goals_against=("goals_against", "sum"),
+        start_elo=("elo_before", "first"),
+        end_elo=("elo_after", "last"),
+        peak_elo=("elo_after", "max"),
+        trough_elo=("elo_after", "min"),
+    )
+    stats_df["peak_elo"] = stats_df[["peak_elo", "start_elo"]].max(axis=1)
+    stats_df["trough_elo"] = stats_df[["trough_elo", "start_elo"]].min(axis=1)
+    stats_df["elo_change"] = stats_df["end_elo"] - stats_df["start_elo"]
+
+    # 1 is the highest rated team. positive rank change is moving up the table
+    by_season = stats_df.groupby(level="season")
+    stats_df["start_rank"] = by_season["start_elo"].rank(method="min", ascending=False)
+    stats_df["end_rank"] = by_season["end_elo"].rank(method="min", ascending=False)
+    stats_df["rank_change"] = stats_df["start_rank"] - stats_df["end_rank"]
+    stats_df = stats_df.astype(int)
+
+    season_stats = {str(season): dict() for season in seasons}
+    for (season, team), line in stats_df.to_dict(orient="index").items():
+        season_stats[str(season)][str(fixtures.teams[team])] = line
+    return season_stats
+
+
+def handle(league) -> str:
+    """
+    Creates a json file of each team's wins, losses, goals and elo movement for every season. Only
+    seasons with new results since the last run are recalculated.
+    """
+    fixtures = Fixtures.load(os.path.join(league.elos_output_path, FIXTURES_FN))
+    output_path = os.path.join(league.elos_output_path, SEASON_STATS_FN)
+
+    stats = {"fingerprints": dict(), "seasons": dict()}
+    if os.path.exists(output_path):
+        with open(output_path, "r") as f:
+            stats = json.load(f)
+
+    fingerprints = season_fingerprints(fixtures)
+    changed = [
+        int(season)
+        for season, fingerprint in fingerprints.items()
+        if stats["fingerprints"].get(season) != fingerprint
+    ]
+    if changed or fingerprints.keys() != stats["fingerprints"].keys():
+        stats["seasons"] = {
+            season: stats["seasons"][season]
+            for season in fingerprints
+            if season in stats["seasons"]
+        }
+        stats["seasons"].update(calculate_season_stats(fixtures, changed))
+        stats["fingerprints"] = fingerprints
+
+        write_json(output_path, stats, compress_outputs(league))
+    return output_path
@@ -0,0 +1,112 @@
+import mmap
+import os
+import struct
+from datetime import date
+
+import numpy as np
+
+from elo_lib.output import write_bytes
+
+# magic, format version, snapshot version, date ordinal, number of teams, bytes per team name
+HEADER = struct.Struct("<4sHxxQiII")
+MAGIC = b"ELOS"
+FORMAT_VERSION = 1
+RATINGS_DTYPE = np.dtype("<i2")
+
+
+def ratings_offset(n_teams: int, name_size: int) -> int:
+    """
+    Where the ratings array starts, after the header and team table, aligned to 8 bytes.
+    """
+    return (HEADER.size + n_teams * name_size + 7) // 8 * 8
+
+
+def pack_snapshot(version: int, current_elo: dict) -> bytes:
+    """
+    Lays out a snapshot: header, a fixed width table of utf-8 team names, then an int16 elo for
+    every team in the same order. Teams are the same as in `latest_elos.json`.
+    """
+    teams = list(current_elo["teams"])
+    names = np.array([team.encode() for team in teams], dtype=bytes)
+    name_size = max(names.dtype.itemsize, 1)
+    ratings = np.array(list(current_elo["teams"].values()), RATINGS_DTYPE)
+    day = date.fromisoformat(current_elo["date"]).toordinal() if current_elo["date"] else 0
+
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, version, day, len(teams), name_size)
+    table = names.astype(f"S{name_size}").tobytes()
+    padding = bytes(ratings_offset(len(teams), name_size) - HEADER.size - len(table))
+    return header + table + padding + ratings.tobytes()
+
+
+def read_version(path: str) -> int:
+    """
+    Returns the version of the snapshot at path, 0 if there isn't one.
+    """
+    if not os.path.exists(path):
+        return 0
+    with open(path, "rb") as f:
+        return HEADER.unpack(f.read(HEADER.size))[2]
+
+
+def write_snapshot(path: str, current_elo: dict) -> bool:
+    """
+    Publishes the latest elos as a binary snapshot. The version goes up by one each time the elos
+    change, and the file is swapped atomically so readers see either the old or the new snapshot.
+    Returns whether a new version was written.
+    """
+    version = read_version(path)
+    if version:
+        with open(path, "rb") as f:
+            if f.read() == pack_snapshot(version, current_elo):
+                return False
+    return write_bytes(path, pack_snapshot(version + 1, current_elo))
+
+
+class RatingsSnapshot:
+    """
+    Class to read a ratings snapshot through mmap. `ratings` and `teams` are numpy views straight
+    onto the mapped file, so every process reading the same snapshot shares one copy of it in the
+    page cache. Call `refresh` to pick up a newer snapshot.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.load()
+
+    def load(self) -> None:
+        with open(self.path, "rb") as f:
+            self.stat = os.fstat(f.fileno())
+            # the map stays valid after the file is closed, or replaced by a newer snapshot
+            self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, format_version, self.version, day, n_teams, name_size = HEADER.unpack_from(
+            self.mmap
+        )
+        if magic != MAGIC or format_version != FORMAT_VERSION:
+            raise Exception(f"{self.path} isn't a version {FORMAT_VERSION} ratings snapshot.")
+
+        self.date = date.fromordinal(day) if day else None
+        self.teams = np.frombuffer(
+            self.mmap, dtype=f"S{name_size}", count=n_teams, offset=HEADER.size
+        )
+        self.ratings = np.frombuffer(
+            self.mmap,
+            dtype=RATINGS_DTYPE,
+            count=n_teams,
+            offset=ratings_offset(n_teams, name_size),
+        )
+        self.team_ids = {team.decode(): i for i, team in enumerate(self.teams.tolist())}
+
+    def refresh(self) -> bool:
+        """
+        Maps the snapshot again if the file was swapped since it was last loaded. Views taken
+        before keep pointing at the old snapshot. Returns whether there was a new one.
+        """
+        stat = os.stat(self.path)
+        if (stat.st_ino, stat.st_mtime_ns) == (self.stat.st_ino, self.stat.st_mtime_ns):
+            return False
+        self.load()
+        return True
+
+    def rating(self, team: str) -> int:
+        return int(self.ratings[self.team_ids[team]])
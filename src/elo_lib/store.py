@@ -0,0 +1,232 @@
+import os
+import sqlite3
+from datetime import date
+
+import numpy as np
+
+from elo_lib.fixtures import Fixtures
+from elo_lib.utils import STORE_FN
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS fixtures (
+    date INTEGER NOT NULL,
+    home TEXT NOT NULL,
+    away TEXT NOT NULL,
+    game_order INTEGER NOT NULL,
+    season INTEGER NOT NULL,
+    type TEXT,
+    venue TEXT,
+    home_score INTEGER,
+    away_score INTEGER,
+    played INTEGER NOT NULL,
+    PRIMARY KEY (date, home, away)
+);
+CREATE INDEX IF NOT EXISTS fixtures_played_date ON fixtures (played, date, game_order);
+CREATE INDEX IF NOT EXISTS fixtures_season_home ON fixtures (season, home);
+CREATE INDEX IF NOT EXISTS fixtures_season_away ON fixtures (season, away);
+
+CREATE TABLE IF NOT EXISTS game_elos (
+    date INTEGER NOT NULL,
+    home TEXT NOT NULL,
+    away TEXT NOT NULL,
+    elo_before_home INTEGER NOT NULL,
+    elo_before_away INTEGER NOT NULL,
+    elo_after_home INTEGER NOT NULL,
+    elo_after_away INTEGER NOT NULL,
+    expected_win_home REAL,
+    expected_win_away REAL,
+    PRIMARY KEY (date, home, away)
+);
+
+CREATE TABLE IF NOT EXISTS latest_elos (
+    team TEXT PRIMARY KEY,
+    elo INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value
+);
+"""
+
+# only rows whose values changed are rewritten
+UPSERT_FIXTURE = """
+INSERT INTO fixtures VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (date, home, away) DO UPDATE SET
+    game_order = excluded.game_order,
+    season = excluded.season,
+    type = excluded.type,
+    venue = excluded.venue,
+    home_score = excluded.home_score,
+    away_score = excluded.away_score,
+    played = excluded.played
+WHERE (game_order, season, type, venue, home_score, away_score, played)
+    IS NOT (excluded.game_order, excluded.season, excluded.type, excluded.venue,
+        excluded.home_score, excluded.away_score, excluded.played)
+"""
+
+# games that weren't replayed have no expected wins, keep the ones already stored
+UPSERT_GAME_ELOS = """
+INSERT INTO game_elos VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (date, home, away) DO UPDATE SET
+    elo_before_home = excluded.elo_before_home,
+    elo_before_away = excluded.elo_before_away,
+    elo_after_home = excluded.elo_after_home,
+    elo_after_away = excluded.elo_after_away,
+    expected_win_home = coalesce(excluded.expected_win_home, expected_win_home),
+    expected_win_away = coalesce(excluded.expected_win_away, expected_win_away)
+WHERE (elo_before_home, elo_before_away, elo_after_home, elo_after_away) IS NOT (
+    excluded.elo_before_home, excluded.elo_before_away, excluded.elo_after_home,
+    excluded.elo_after_away
+) OR excluded.expected_win_home IS NOT NULL
+"""
+
+
+def open_store(league):
+    """
+    Returns the league's ResultsStore if its config picks the sqlite backend, else None.
+    """
+    if getattr(league, "backend", "files") != "sqlite":
+        return None
+    path = getattr(league, "store_path", None) or os.path.join(league.elos_output_path, STORE_FN)
+    return ResultsStore(path)
+
+
+def nan_to_none(values: np.ndarray) -> list:
+    return [None if np.isnan(value) else value for value in values.tolist()]
+
+
+class ResultsStore:
+    """
+    Class to hold an sqlite database of fixtures, the elo changes of every game and the latest
+    elos. An alternative to reading the whole results csv for stages that only need a few rows.
+    WAL mode lets other tools read it while it's being written.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def write(
+        self,
+        fixtures: Fixtures,
+        current_elo: dict,
+        expected_wins_home: np.ndarray = None,
+        expected_wins_away: np.ndarray = None,
+    ) -> None:
+        """
+        Brings the store in line with the fixtures and current elo in one transaction. Fixtures are
+        keyed by date and teams, fixtures that aren't in `fixtures` anymore are deleted.
+        """
+        if expected_wins_home is None:
+            expected_wins_home = np.full(len(fixtures), np.nan)
+            expected_wins_away = np.full(len(fixtures), np.nan)
+
+        dates = fixtures.date.tolist()
+        homes = fixtures.team_names(fixtures.home).tolist()
+        aways = fixtures.team_names(fixtures.away).tolist()
+        fixture_rows = zip(
+            dates,
+            homes,
+            aways,
+            range(len(fixtures)),
+            fixtures.season.tolist(),
+            fixtures.types[fixtures.type].tolist(),
+            fixtures.venues[fixtures.venue].tolist(),
+            fixtures.home_score.tolist(),
+            fixtures.away_score.tolist(),
+            fixtures.played.astype(int).tolist(),
+        )
+
+        played = np.flatnonzero(fixtures.played)
+        game_elo_rows = zip(
+            fixtures.date[played].tolist(),
+            fixtures.team_names(fixtures.home[played]).tolist(),
+            fixtures.team_names(fixtures.away[played]).tolist(),
+            fixtures.elo_before_home[played].tolist(),
+            fixtures.elo_before_away[played].tolist(),
+            fixtures.elo_after_home[played].tolist(),
+            fixtures.elo_after_away[played].tolist(),
+            nan_to_none(expected_wins_home[played]),
+            nan_to_none(expected_wins_away[played]),
+        )
+
+        with self.connection:
+            self.connection.execute(
+                "CREATE TEMP TABLE IF NOT EXISTS current_fixtures (date, home, away)"
+            )
+            self.connection.execute("DELETE FROM current_fixtures")
+            self.connection.executemany(
+                "INSERT INTO current_fixtures VALUES (?, ?, ?)", zip(dates, homes, aways)
+            )
+            for table in ["fixtures", "game_elos"]:
+                self.connection.execute(
+                    f"""
+                    DELETE FROM {table} WHERE NOT EXISTS (
+                        SELECT 1 FROM current_fixtures AS c
+                        WHERE c.date = {table}.date AND c.home = {table}.home
+                            AND c.away = {table}.away
+                    )
+                    """
+                )
+            self.connection.executemany(UPSERT_FIXTURE, fixture_rows)
+            self.connection.executemany(UPSERT_GAME_ELOS, game_elo_rows)
+
+            self.connection.execute("DELETE FROM latest_elos")
+            self.connection.executemany(
+                "INSERT INTO latest_elos VALUES (?, ?)", current_elo["teams"].items()
+            )
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                [
+                    ("date", current_elo["date"]),
+                    ("current_season", current_elo["current_season"]),
+                ],
+            )
+
+    def latest_elos(self) -> dict:
+        """
+        Returns the latest elos in the same shape as `latest_elos.json`.
+        """
+        meta = dict(self.connection.execute("SELECT key, value FROM meta").fetchall())
+        teams = dict(self.connection.execute("SELECT team, elo FROM latest_elos").fetchall())
+        return {
+            "date": meta.get("date"),
+            "teams": teams,
+            "current_season": meta.get("current_season"),
+        }
+
+    def unplayed(self, limit: int = 5) -> list[dict]:
+        """
+        Returns the next fixtures that haven't been played yet.
+        """
+        rows = self.connection.execute(
+            """
+            SELECT date, home, away, venue, type FROM fixtures
+            WHERE played = 0 ORDER BY date, game_order LIMIT ?
+            """,
+            (limit,),
+        ).fetchall()
+        return [{**dict(row), "date": date.fromordinal(row["date"])} for row in rows]
+
+    def team_played(self, team: str, season: int) -> bool:
+        """
+        Checks if a team has played a game in a season.
+        """
+        row = self.connection.execute(
+            """
+            SELECT EXISTS (
+                SELECT 1 FROM fixtures WHERE played = 1 AND season = ? AND home = ?
+                UNION ALL
+                SELECT 1 FROM fixtures WHERE played = 1 AND season = ? AND away = ?
+            )
+            """,
+            (season, team, season, team),
+        ).fetchone()
+        return bool(row[0])
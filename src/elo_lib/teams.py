@@ -0,0 +1,126 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from elo_lib.output import write_json
+from elo_lib.utils import TEAM_REGISTRY_FN, clean_names
+
+
+class TeamRegistry:
+    """
+    Class to hold the canonical team names of a league and the integer ids they are interned to.
+
+    `teams` is the "teams" section of the league config, canonical names mapped to their city, team
+    name and any other aliases, ie
+        {"montréal": {"city": "Montréal", "name": "Victoire", "aliases": ["mtl"]}}
+    Without it every cleaned name is its own canonical name. With it, names that don't match any
+    team are an error.
+    """
+
+    def __init__(self, teams: dict = None):
+        self.teams = teams or dict()
+        self.names = []
+        self.ids = dict()
+        # raw name as it appears in the data -> canonical name
+        self.resolved = dict()
+        # raw names resolved by this registry, only these are kept in the cache
+        self.seen = set()
+        self.aliases = dict()
+
+        for canonical, team in self.teams.items():
+            city = team.get("city")
+            name = team.get("name")
+            variants = [canonical, city, name, *team.get("aliases", [])]
+            if city and name:
+                variants.append(f"{city} {name}")
+            for alias in clean_names(pd.Series([v for v in variants if v])):
+                self.aliases[alias] = canonical
+            self.team_id(canonical)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @classmethod
+    def from_league(cls, league):
+        """
+        Builds the registry from the league config, reusing the names resolved on earlier runs.
+        """
+        registry = cls(getattr(league, "teams", None))
+        cache_path = os.path.join(league.clean_output_path, TEAM_REGISTRY_FN)
+        if os.path.exists(cache_path):
+            registry.load_cache(cache_path)
+        return registry
+
+    def fingerprint(self) -> str:
+        """
+        Hash of the teams config. A cache made with a different config is ignored.
+        """
+        return hashlib.md5(json.dumps(self.teams, sort_keys=True).encode()).hexdigest()
+
+    def load_cache(self, path: str) -> None:
+        """
+        Reuses the resolved names of an earlier run. Teams only get ids once they're in the data.
+        """
+        with open(path, "r") as f:
+            cache = json.load(f)
+        if cache["fingerprint"] != self.fingerprint():
+            return
+        self.resolved.update(cache["resolved"])
+
+    def save_cache(self, path: str) -> None:
+        """
+        Saves the resolved names of this run, names that aren't in the data anymore are dropped.
+        """
+        resolved = {name: self.resolved[name] for name in self.resolved if name in self.seen}
+        write_json(path, {"fingerprint": self.fingerprint(), "resolved": resolved})
+
+    def canonical(self, name: str) -> str:
+        """
+        Returns the canonical name of a team from any raw or alias name.
+        """
+        return self.resolve(pd.Series([name]))[0]
+
+    def team_id(self, name: str) -> int:
+        """
+        Returns the id of a canonical name, interning it if this is the first time it's been seen.
+        """
+        if name not in self.ids:
+            self.ids[name] = len(self.names)
+            self.names.append(name)
+        return self.ids[name]
+
+    def resolve(self, raw_names: pd.Series) -> list[str]:
+        """
+        Returns the canonical name of each raw name. Only names that haven't been seen before get
+        cleaned. Raises one exception listing every name that doesn't match a team in the config.
+        """
+        self.seen.update(raw_names)
+        new_names = raw_names[~raw_names.isin(self.resolved)].drop_duplicates()
+        if len(new_names):
+            cleaned = clean_names(new_names)
+            if self.teams:
+                unknown = new_names[~cleaned.isin(self.aliases)]
+                if len(unknown):
+                    raise Exception(
+                        "Unknown teams, add them to the league config: "
+                        + ", ".join(sorted(repr(name) for name in unknown))
+                    )
+            canonical = cleaned.map(self.aliases).fillna(cleaned)
+            self.resolved.update(zip(new_names, canonical))
+        return [self.resolved[name] for name in raw_names]
+
+    def encode(self, names: pd.Series) -> np.ndarray:
+        """
+        Takes a column of raw team names and returns an array of team ids. Names are only resolved
+        once per unique value. Raises an exception if any name is missing.
+        """
+        codes, uniques = pd.factorize(names)
+        if (codes == -1).any():
+            rows = names.index[codes == -1]
+            raise Exception(f"Missing team names in rows: {', '.join(map(str, rows))}")
+        canonical = self.resolve(pd.Series(uniques))
+        unique_ids = np.array([self.team_id(name) for name in canonical], dtype=np.int16)
+        return unique_ids[codes]
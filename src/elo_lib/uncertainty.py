@@ -0,0 +1,150 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from elo_lib.fixtures import Fixtures
+from elo_lib.output import compress_outputs, write_json
+from elo_lib.upcoming_projection import next_fixtures
+from elo_lib.utils import (
+    ELO_INTERVALS_FN,
+    FIXTURES_FN,
+    LATEST_ELOS_FN,
+    actual_result,
+    calculate_movm,
+    expected_result,
+    k_value,
+)
+
+
+def played_games(fixtures: Fixtures) -> dict:
+    """
+    Returns what a replay needs from the played fixtures, in the order they were played. Margin
+    multipliers and actual results are the same in every replay so they're calculated once here.
+    """
+    played = np.flatnonzero(fixtures.played)
+    home_scores = fixtures.home_score[played].tolist()
+    away_scores = fixtures.away_score[played].tolist()
+    actual = [actual_result(h, a) for h, a in zip(home_scores, away_scores)]
+    return {
+        "home": fixtures.home[played].astype(np.int64),
+        "away": fixtures.away[played].astype(np.int64),
+        "season": fixtures.season[played].astype(np.int64),
+        "movm": np.array([calculate_movm(h, a) for h, a in zip(home_scores, away_scores)]),
+        "actual_home": np.array([home for home, _ in actual], dtype=np.float64),
+        "actual_away": np.array([away for _, away in actual], dtype=np.float64),
+        "n_teams": len(fixtures.teams),
+        "first_season": int(fixtures.season[0]),
+    }
+
+
+def replay_batch(games: dict, weights: np.ndarray) -> np.ndarray:
+    """
+    Replays every game for a batch of replicas at once, same steps as `calculate_elo.handle`. Each
+    replica counts game i `weights[replica, i]` times. Returns the final elos as a
+    (replicas, teams) array.
+    """
+    k = k_value()
+    elos = np.full((len(weights), games["n_teams"]), 1300.0)
+    current_season = games["first_season"]
+    for i in range(len(games["home"])):
+        home = games["home"][i]
+        away = games["away"][i]
+
+        # teams that haven't played yet are at 1300 and stay there
+        if games["season"][i] > current_season:
+            elos = np.round(elos - (elos - 1300) / 3)
+            current_season = games["season"][i]
+
+        elo_home = elos[:, home]
+        elo_away = elos[:, away]
+        expected_win_home, expected_win_away = expected_result(elo_home, elo_away)
+        step = k * games["movm"][i] * weights[:, i]
+        elos[:, home] = np.round(elo_home + step * (games["actual_home"][i] - expected_win_home))
+        elos[:, away] = np.round(elo_away + step * (games["actual_away"][i] - expected_win_away))
+    return elos
+
+
+def bootstrap_batch(games: dict, replicas: int, seed) -> np.ndarray:
+    """
+    Replays a batch of Poisson bootstrap replicas, each game resampled ~Poisson(1) times.
+    """
+    rng = np.random.default_rng(seed)
+    return replay_batch(games, rng.poisson(1.0, (replicas, len(games["home"]))))
+
+
+def bootstrap_elos(
+    fixtures: Fixtures, replicas: int = 500, workers: int = None, batch_size: int = 50, seed=0
+) -> np.ndarray:
+    """
+    Returns the final elos of `replicas` bootstrapped replays of every played game as a
+    (replicas, teams) array. Batches of replicas run in parallel across a process pool, with
+    workers=1 they run in this process.
+    """
+    games = played_games(fixtures)
+    batches = [min(batch_size, replicas - start) for start in range(0, replicas, batch_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(batches))
+
+    if workers == 1:
+        return np.concatenate([bootstrap_batch(games, n, s) for n, s in zip(batches, seeds)])
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(bootstrap_batch, [games] * len(batches), batches, seeds)
+        return np.concatenate(list(results))
+
+
+def handle(league, replicas: int = 500, workers: int = None, interval: float = 90) -> str:
+    """
+    Creates a json file of each team's elo with a bootstrapped interval, and the win
+    probabilities of the next 5 fixtures with intervals.
+    """
+    output_path = os.path.join(league.elos_output_path, ELO_INTERVALS_FN)
+    fixtures = Fixtures.load(os.path.join(league.elos_output_path, FIXTURES_FN))
+    with open(os.path.join(league.elos_output_path, LATEST_ELOS_FN), "r") as f:
+        latest_elos = json.load(f)
+
+    elos = bootstrap_elos(fixtures, replicas, workers)
+    percentiles = [(100 - interval) / 2, 50, (100 + interval) / 2]
+    low, median, high = np.percentile(elos, percentiles, axis=0)
+
+    team_ids = {name: team for team, name in enumerate(fixtures.teams.tolist())}
+    teams = {
+        name: {
+            "elo": elo,
+            "median": int(np.round(median[team_ids[name]])),
+            "low": int(np.round(low[team_ids[name]])),
+            "high": int(np.round(high[team_ids[name]])),
+        }
+        for name, elo in latest_elos["teams"].items()
+    }
+
+    games = []
+    for game in next_fixtures(fixtures):
+        expected_win_home, _ = expected_result(
+            elos[:, team_ids[game["home"]]], elos[:, team_ids[game["away"]]]
+        )
+        win_low, win_median, win_high = np.percentile(expected_win_home, percentiles)
+        games.append(
+            {
+                "date": game["date"].strftime("%b. %d, %Y"),
+                "away_team": game["away"],
+                "home_team": game["home"],
+                "expected_win_home": expected_result(
+                    latest_elos["teams"].get(game["home"], 1300),
+                    latest_elos["teams"].get(game["away"], 1300),
+                )[0],
+                "expected_win_home_median": float(win_median),
+                "expected_win_home_low": float(win_low),
+                "expected_win_home_high": float(win_high),
+            }
+        )
+
+    export_data = {
+        "date": latest_elos["date"],
+        "replicas": replicas,
+        "interval": interval,
+        "teams": teams,
+        "games": games,
+    }
+    write_json(output_path, export_data, compress_outputs(league))
+    return output_path
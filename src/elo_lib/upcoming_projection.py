@@ -1,15 +1,18 @@
 import json
 import os
 import re
-from datetime import datetime
+from datetime import date, datetime
 
 import numpy as np
 import pandas as pd
 
+from elo_lib.fixtures import Fixtures
+from elo_lib.output import compress_outputs, write_json
+from elo_lib.store import open_store
 from elo_lib.utils import (
+    FIXTURES_FN,
     GAME_PROJECTIONS_FN,
     LATEST_ELOS_FN,
-    RESULTS_ELOS_FN,
     expected_result,
 )
 
@@ -36,34 +39,6 @@ def check_if_team_played(team: str, current_season: int, result_df: pd.DataFrame
     return len(played_games) > 0
 
 
-def handle_row_wrapper(current_elo: dict):
-    # check if each team has played a game yet this season. If not adjust Elo
-    # 1/3rd back to 1300.
-
-    """
-    wrapper to inject latest elos into handle row function
-    """
-
-    def handle_row(row):
-        """
-        Calculate expected result for each row in a pandas dataframe and add to row
-        """
-        home = row["home_team"]
-        away = row["away_team"]
-
-        start_elo_home = current_elo[home]
-        start_elo_away = current_elo[away]
-
-        expected_win_home, expected_win_away = expected_result(start_elo_home, start_elo_away)
-        row["expected_win_home"] = expected_win_home
-        row["expected_win_away"] = expected_win_away
-        row["elo_before_home"] = start_elo_home
-        row["elo_before_away"] = start_elo_away
-        return row
-
-    return handle_row
-
-
 def get_newest_file(input_dir: str):
     """
     Finds the newest file from a directory based on timestamp
@@ -86,52 +61,70 @@ def get_newest_file(input_dir: str):
     return os.path.join(results_dir, source_file)
 
 
+def next_fixtures(fixtures: Fixtures, n: int = 5) -> list[dict]:
+    """
+    Returns the next n fixtures that haven't been played yet.
+    """
+    unplayed = np.flatnonzero(~fixtures.played)
+    unplayed = unplayed[np.argsort(fixtures.date[unplayed], kind="stable")][:n]
+    return [
+        {
+            "date": date.fromordinal(int(fixtures.date[fixture])),
+            "home": str(fixtures.teams[fixtures.home[fixture]]),
+            "away": str(fixtures.teams[fixtures.away[fixture]]),
+            "venue": str(fixtures.venues[fixtures.venue[fixture]]),
+            "type": str(fixtures.types[fixtures.type[fixture]]),
+        }
+        for fixture in unplayed.tolist()
+    ]
+
+
+def project_games(games: list[dict], teams: dict) -> list[dict]:
+    """
+    Calculates the expected result of each game from the elos in `teams`, grouped by date.
+    """
+    grouped_games = []
+    for game in games:
+        elo_before_home = teams.get(game["home"], 1300)
+        elo_before_away = teams.get(game["away"], 1300)
+        expected_win_home, expected_win_away = expected_result(elo_before_home, elo_before_away)
+        game_date = game["date"].strftime("%b. %d, %Y")
+        projection = {
+            "away_team": game["away"],
+            "home_team": game["home"],
+            "venue": game["venue"],
+            "type": game["type"],
+            "elo_before_home": elo_before_home,
+            "elo_before_away": elo_before_away,
+            "expected_win_home": expected_win_home,
+            "expected_win_away": expected_win_away,
+        }
+        if grouped_games and grouped_games[-1]["date"] == game_date:
+            grouped_games[-1]["games"].append(projection)
+        else:
+            grouped_games.append({"date": game_date, "games": [projection]})
+    return grouped_games
+
+
 def handle(league):
     # TIMESTAMP = datetime.now().strftime("%Y-%m-%d_%H:%M:%S")
     output_path = os.path.join(league.projections_output_path, GAME_PROJECTIONS_FN)
 
-    # get latest elos
-    with open(os.path.join(league.elos_output_path, LATEST_ELOS_FN), "r") as f:
-        latet_elos = json.load(f)
-
-    source_df = pd.read_csv(
-        os.path.join(league.elos_output_path, RESULTS_ELOS_FN)
-    )  # results+elos file
-
-    source_df["time"] = source_df["time"].str.lower()
-    unplayed_df = source_df[~source_df["time"].str.contains("final")]
-    next_5_df = unplayed_df.sort_values("date").head(5)
+    store = open_store(league)
+    if store:
+        # only the rows needed
+        latet_elos = store.latest_elos()
+        next_5 = store.unplayed(5)
+        store.close()
+    else:
+        # get latest elos
+        with open(os.path.join(league.elos_output_path, LATEST_ELOS_FN), "r") as f:
+            latet_elos = json.load(f)
+        next_5 = next_fixtures(Fixtures.load(os.path.join(league.elos_output_path, FIXTURES_FN)))
 
     # calculate odds on those 5 based on latest elos
-    handle_row_with_elos = handle_row_wrapper(latet_elos["teams"])
-    next_5_df = next_5_df.apply(handle_row_with_elos, axis=1)
-    next_5_df["date"] = pd.to_datetime(next_5_df["date"]).dt.strftime("%b. %d, %Y")
-
-    next_5 = next_5_df[
-        [
-            "date",
-            "away_team",
-            "home_team",
-            "venue",
-            "type",
-            "elo_before_home",
-            "elo_before_away",
-            "expected_win_home",
-            "expected_win_away",
-        ]
-    ].to_dict(orient="records")
-
-    # group by date
-    grouped_next_5 = []
-    for game in next_5:
-        if game["date"] in [n["date"] for n in grouped_next_5]:
-            needle_date = game.pop("date")
-            filtered_dates = filter(lambda row: row["date"] == needle_date, grouped_next_5)
-            list(filtered_dates)[0]["games"].append({**game})
-        else:
-            grouped_next_5.append({"date": game.pop("date"), "games": [{**game}]})
+    grouped_next_5 = project_games(next_5, latet_elos["teams"])
 
     # save results
-    with open(output_path, "w") as f:
-        json.dump(grouped_next_5, f)
+    write_json(output_path, grouped_next_5, compress_outputs(league))
     return output_path
@@ -8,8 +8,20 @@ import pandas as pd
 
 RESULTS_ELOS_FN = "league_all_results_with_elos.csv"
 CHART_DATA_FN = "chartable_wphl_elos.json"
+CHART_MANIFEST_FN = "chart_manifest.json"
+CHART_SHARDS_DIR = "chart_shards"
 LATEST_ELOS_FN = "latest_elos.json"
+SNAPSHOT_FN = "latest_elos.bin"
 GAME_PROJECTIONS_FN = "game_projections.json"
+FIXTURES_FN = "league_fixtures.npz"
+TEAM_REGISTRY_FN = "team_registry.json"
+SEASON_STATS_FN = "season_stats.json"
+STORE_FN = "league.sqlite"
+ELO_INTERVALS_FN = "elo_intervals.json"
+SCORELINES_FN = "scoreline_projections.json"
+
+# 538 uses 50 for nfl https://fivethirtyeight.com/methodology/how-our-nhl-predictions-work/
+HOME_ADVANTAGE = 50
 
 
 def revert_elo_to_mean(season_ending_elo: int) -> int:
@@ -37,9 +49,6 @@ def time_stamp() -> str:
 
 
 def expected_result(elo_home: int, elo_away: int) -> List[np.float64]:
-    # 538 uses 50 for nfl https://fivethirtyeight.com/methodology/how-our-nhl-predictions-work/
-    HOME_ADVANTAGE = 50
-
     # TODO: see if playoff adjustment of 1.25 should go here per
     # https://fivethirtyeight.com/methodology/how-our-nhl-predictions-work/
     rating_home = 10 ** ((elo_home + HOME_ADVANTAGE) / 400)
@@ -56,6 +65,14 @@ def clean_name(name: str) -> str:
     return name
 
 
+def clean_names(names: pd.Series) -> pd.Series:
+    """
+    Same as `clean_name` for a whole column of names at once.
+    """
+    names = names.str.strip().str.replace(" ", "_").str.lower()
+    return names.replace("montreal", standardize_montreal("montreal"))
+
+
 def k_value() -> int:
     """
     weight matches more if stakes are higher. based on trial and error
@@ -121,33 +138,6 @@ def standardize_montreal(team: str) -> str:
     return team.replace("e", "é")
 
 
-def structure_chartable_df(output_df: pd.DataFrame) -> pd.DataFrame:
-    # make df with all "after" elos over time so it's easier to work with
-
-    filtered_df = output_df[output_df["time"].str.lower().str.contains("final")]
-    after_elos_home_df = filtered_df[
-        [
-            "date",
-            "home_team",
-            "elo_after_home",
-        ]
-    ].rename(columns={"home_team": "team", "elo_after_home": "elo"})
-    after_elos_away_df = filtered_df[
-        [
-            "date",
-            "away_team",
-            "elo_after_away",
-        ]
-    ].rename(columns={"away_team": "team", "elo_after_away": "elo"})
-    after_elos_all = pd.concat([after_elos_home_df, after_elos_away_df], ignore_index=True)
-
-    after_elos_all = after_elos_all.sort_values("date")
-
-    pivoted_elo_df = after_elos_all.pivot(index="date", columns="team")
-    pivoted_elo_df.columns = [y for x, y in pivoted_elo_df.columns]
-    return pivoted_elo_df
-
-
 def drop_nans(input_dict: dict) -> dict:
     """
     drop key-values pairs if value is NaN two levels in
@@ -0,0 +1,179 @@
+import asyncio
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import requests
+
+from elo_lib.calculate_elo import replay_fixtures
+from elo_lib.chart_data import handle as handle_chart_data
+from elo_lib.clean_seasons import clean_season
+from elo_lib.fixtures import Fixtures, date_ordinals
+from elo_lib.get_season import fetch_season, season_path
+from elo_lib.output import compress_outputs, write_json
+from elo_lib.season_stats import handle as handle_season_stats
+from elo_lib.snapshot import write_snapshot
+from elo_lib.store import open_store
+from elo_lib.teams import TeamRegistry
+from elo_lib.upcoming_projection import handle as handle_projection
+from elo_lib.utils import FIXTURES_FN, LATEST_ELOS_FN, SNAPSHOT_FN
+
+
+def new_finals(previous: list, matches: list, key: str = "game_id") -> list:
+    """
+    Returns the matches that are final now but weren't in the previous payload of the feed.
+    """
+    previous_finals = {game[key] for game in previous if "Final" in game["game_status"]}
+    return [
+        game
+        for game in matches
+        if "Final" in game["game_status"] and game[key] not in previous_finals
+    ]
+
+
+class Watcher:
+    """
+    Class to hold the fixtures and ratings of a league in memory between polls of a season's feed.
+    Starts from the outputs of the last `calculate` and the last saved payload of the season.
+    """
+
+    def __init__(self, seasonid, league):
+        self.seasonid = seasonid
+        self.league = league
+        self.game_id_key = getattr(league, "game_id_key", "game_id")
+        self.registry = TeamRegistry.from_league(league)
+
+        self.fixtures_path = os.path.join(league.elos_output_path, FIXTURES_FN)
+        self.latest_elos_path = os.path.join(league.elos_output_path, LATEST_ELOS_FN)
+        self.fixtures = Fixtures.load(self.fixtures_path)
+        with open(self.latest_elos_path, "r") as f:
+            self.current_elo = json.load(f)
+
+        self.snapshot = []
+        if os.path.exists(season_path(seasonid, league)):
+            with open(season_path(seasonid, league), "r") as f:
+                self.snapshot = json.load(f)
+
+    def mark_played(self, fixtures: Fixtures, games_df: pd.DataFrame) -> np.ndarray:
+        """
+        Records the scores of newly final games on their fixtures and returns the fixture indexes.
+        Games that aren't in the fixtures yet are skipped, they need a full `calculate`.
+        """
+        team_ids = {name: team for team, name in enumerate(fixtures.teams.tolist())}
+        homes = [team_ids.get(name, -1) for name in self.registry.resolve(games_df["home_team"])]
+        aways = [team_ids.get(name, -1) for name in self.registry.resolve(games_df["away_team"])]
+        dates = date_ordinals(pd.to_datetime(games_df["date"]))
+        home_scores = games_df["home_score"].astype(int).tolist()
+        away_scores = games_df["away_score"].astype(int).tolist()
+
+        games = []
+        for i, (game_date, home, away) in enumerate(zip(dates.tolist(), homes, aways)):
+            fixture = np.flatnonzero(
+                (fixtures.date == game_date)
+                & (fixtures.home == home)
+                & (fixtures.away == away)
+                & ~fixtures.played
+            )
+            if not len(fixture):
+                print(
+                    f"{games_df['away_team'].iloc[i]} at {games_df['home_team'].iloc[i]} isn't an "
+                    "unplayed fixture, run cleandata and calculate to add it."
+                )
+                continue
+            fixtures.home_score[fixture[0]] = home_scores[i]
+            fixtures.away_score[fixture[0]] = away_scores[i]
+            games.append(fixture[0])
+        return np.sort(np.array(games, dtype=np.int64))
+
+    def apply(
+        self, fixtures: Fixtures, current_elo: dict, games: np.ndarray
+    ) -> [np.ndarray, np.ndarray]:
+        """
+        Updates the ratings with newly played games. Games that come after everything already
+        played are applied on top of the current elos, otherwise every game is replayed so the
+        order stays the same as `calculate`. Returns the expected wins of the replayed games.
+        """
+        played = np.flatnonzero(fixtures.played)
+        fixtures.played[games] = True
+        if not len(played) or games[0] > played[-1]:
+            return replay_fixtures(fixtures, current_elo, games)
+        else:
+            current_elo.update(
+                {"date": None, "teams": dict(), "current_season": int(fixtures.season[0])}
+            )
+            return replay_fixtures(fixtures, current_elo)
+
+    def update(self, matches: list) -> list[str]:
+        """
+        Takes the latest payload of the feed, applies any games that just finished and regenerates
+        the outputs they affect. Games are applied to copies of the fixtures and elos that are only
+        kept, along with the payload, once every output is written. If anything fails the watcher
+        is left as it was, so the games are picked up again by the next poll or after a restart.
+        Returns the paths of the files that were written.
+        """
+        finals = new_finals(self.snapshot, matches, self.game_id_key)
+        written = []
+        if finals:
+            fixtures = self.fixtures.copy()
+            current_elo = {**self.current_elo, "teams": dict(self.current_elo["teams"])}
+            games = self.mark_played(fixtures, clean_season(finals, self.seasonid, self.league))
+            if len(games):
+                expected_wins = self.apply(fixtures, current_elo, games)
+                written += self.write_outputs(fixtures, current_elo, expected_wins)
+                self.fixtures, self.current_elo = fixtures, current_elo
+        if matches != self.snapshot:
+            write_json(season_path(self.seasonid, self.league), matches)
+            self.snapshot = matches
+            written.append(season_path(self.seasonid, self.league))
+        return written
+
+    def write_outputs(
+        self, fixtures: Fixtures, current_elo: dict, expected_wins: [np.ndarray, np.ndarray]
+    ) -> list[str]:
+        """
+        Saves the fixtures and latest elos and regenerates the outputs built from them.
+        """
+        fixtures.save(self.fixtures_path)
+        write_json(self.latest_elos_path, current_elo, compress_outputs(self.league))
+        snapshot_path = os.path.join(self.league.elos_output_path, SNAPSHOT_FN)
+        write_snapshot(snapshot_path, current_elo)
+        written = [self.fixtures_path, self.latest_elos_path, snapshot_path]
+
+        store = open_store(self.league)
+        if store:
+            store.write(fixtures, current_elo, *expected_wins)
+            store.close()
+            written.append(store.path)
+        written.append(handle_chart_data(self.league))
+        written.append(handle_projection(self.league))
+        written.append(handle_season_stats(self.league))
+        return written
+
+
+async def watch(seasonid, league, interval: float = 60, max_polls: int = None) -> None:
+    """
+    Polls the feed of a season every `interval` seconds and updates ratings and outputs as games
+    finish. The results csv isn't rewritten, the next `calculate` brings it up to date.
+    """
+    watcher = Watcher(seasonid, league)
+    polls = 0
+    while True:
+        try:
+            matches = await asyncio.to_thread(fetch_season, seasonid, league)
+        except requests.RequestException as e:
+            print(f"Couldn't get season {seasonid}: {e}")
+        else:
+            if not isinstance(matches, list):
+                print(f"Couldn't find the matches of season {seasonid} in the feed, skipping.")
+            else:
+                try:
+                    for path in watcher.update(matches):
+                        print(path)
+                except Exception as e:
+                    print(f"Couldn't update season {seasonid}, retrying next poll: {e}")
+
+        polls += 1
+        if max_polls is not None and polls >= max_polls:
+            return
+        await asyncio.sleep(interval)
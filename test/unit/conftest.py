@@ -0,0 +1,41 @@
+import pandas as pd
+import pytest
+
+from elo_lib.calculate_elo import replay_fixtures
+from elo_lib.fixtures import Fixtures
+
+RESULTS = {
+    "date": ["2024/01/02", "2024/01/03", "2024/12/04", "2024/12/05"],
+    "time": ["Final", "Final", "Final", "7:00 pm"],
+    "away_team": ["Boston", "Toronto", "Boston", "Toronto"],
+    "away_score": [1, 4, 0, 2],
+    "home_team": ["Toronto", "Boston", "Toronto", "Boston"],
+    "home_score": [3, 2, 2, 1],
+    "venue": ["Coca-Cola", "Tsongas", "Coca-Cola", "Tsongas"],
+    "season": [2024, 2024, 2025, 2025],
+    "type": ["regular"] * 4,
+}
+
+
+@pytest.fixture
+def make_fixtures():
+    """
+    Builds fixtures from a df of results, like the output of `cleandata`, and replays them.
+    Columns passed in replace the ones in RESULTS, which are cut to the same number of games.
+    Team names are resolved with `registry` if one is passed.
+    Returns [<fixtures>, <latest elos>, <expected wins>].
+    """
+
+    def make(registry=None, **columns):
+        n = max((len(values) for values in columns.values()), default=len(RESULTS["date"]))
+        results_df = pd.DataFrame({**{k: v[:n] for k, v in RESULTS.items()}, **columns})
+        fixtures = Fixtures.from_frame(results_df, registry)
+        current_elo = {
+            "date": None,
+            "teams": dict(),
+            "current_season": int(results_df["season"].min()),
+        }
+        expected_wins = replay_fixtures(fixtures, current_elo)
+        return fixtures, current_elo, expected_wins
+
+    return make
@@ -0,0 +1,48 @@
+import json
+import os
+from types import SimpleNamespace
+
+from elo_lib import chart_data
+from elo_lib.chart_data import handle_sharded
+
+
+def save_fixtures(path, make_fixtures, **columns):
+    fixtures, _, _ = make_fixtures(**columns)
+    fixtures.save(os.path.join(path, "league_fixtures.npz"))
+
+
+def test_handle_sharded(tmp_path, make_fixtures, monkeypatch):
+    league = SimpleNamespace(elos_output_path=str(tmp_path), chart_data_output_path=str(tmp_path))
+    save_fixtures(tmp_path, make_fixtures)
+    manifest_path = handle_sharded(league, per_team=True)
+
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    assert list(manifest["shards"]) == ["2024", "2025"]
+    assert manifest["min_date"] == "2024-01-02T00:00:00.000000Z"
+    assert manifest["max_date"] == "2024-12-04T00:00:00.000000Z"
+    with open(tmp_path / manifest["shards"]["2025"]["teams"]["toronto"]["path"]) as f:
+        assert len(json.load(f)["games"]) == 1
+
+    # only the season with a new result is rewritten, even when a new team plays in it
+    written = []
+    write_season_shards = chart_data.write_season_shards
+
+    def record(league, fixtures, season, per_team):
+        written.append(season)
+        return write_season_shards(league, fixtures, season, per_team)
+
+    monkeypatch.setattr(chart_data, "write_season_shards", record)
+    save_fixtures(
+        tmp_path,
+        make_fixtures,
+        time=["Final"] * 4,
+        away_team=["Boston", "Toronto", "Boston", "Ottawa"],
+    )
+    with open(handle_sharded(league, per_team=True)) as f:
+        manifest = json.load(f)
+    assert written == [2025]
+    assert manifest["max_date"] == "2024-12-05T00:00:00.000000Z"
+    with open(tmp_path / manifest["shards"]["2025"]["teams"]["toronto"]["path"]) as f:
+        assert len(json.load(f)["games"]) == 1
+    assert "ottawa" in manifest["shards"]["2025"]["teams"]
@@ -0,0 +1,48 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from elo_lib.fixtures import Fixtures
+from elo_lib.teams import TeamRegistry
+
+
+def montreal_fixtures(make_fixtures):
+    return make_fixtures(
+        time=["Final", "Final", "Final", "7:00 pm EST"],
+        away_team=["Boston", " Montreal ", "Boston", "Montreal"],
+        home_team=["Montreal", "Boston", "Toronto", "Toronto"],
+    )
+
+
+def test_from_frame(make_fixtures):
+    fixtures, _, _ = montreal_fixtures(make_fixtures)
+    assert list(fixtures.teams) == ["montréal", "boston", "toronto"]
+    assert list(fixtures.home) == [0, 1, 2, 2]
+    assert list(fixtures.away) == [1, 0, 1, 0]
+    assert list(fixtures.played) == [True, True, True, False]
+    assert fixtures.home_score.dtype == np.int8
+    assert fixtures.date[0] == date(2024, 1, 2).toordinal()
+
+
+def test_save_load(tmp_path, make_fixtures):
+    fixtures, _, _ = montreal_fixtures(make_fixtures)
+    fixtures.save(tmp_path / "fixtures.npz")
+    loaded = Fixtures.load(tmp_path / "fixtures.npz")
+    for name in Fixtures.__slots__:
+        assert np.array_equal(getattr(loaded, name), getattr(fixtures, name))
+
+
+def test_replay_fixtures(make_fixtures):
+    fixtures, current_elo, (expected_wins_home, _) = montreal_fixtures(make_fixtures)
+    assert current_elo["date"] == "2024-12-04"
+    assert current_elo["current_season"] == 2025
+    assert set(current_elo["teams"]) == {"montréal", "boston", "toronto"}
+    assert list(fixtures.elo_before_home[:2]) == [1300, 1297]
+    assert np.isnan(expected_wins_home[3])
+
+
+def test_from_frame_reports_unknown_teams_together(make_fixtures):
+    registry = TeamRegistry({"boston": {}, "toronto": {}})
+    with pytest.raises(Exception, match="'Ottawa', 'Seattle'"):
+        make_fixtures(registry, home_team=["Ottawa"], away_team=["Seattle"])
@@ -0,0 +1,32 @@
+import gzip
+import json
+import os
+
+from elo_lib.output import write_bytes, write_json
+
+
+def test_write_json(tmp_path):
+    path = tmp_path / "latest_elos.json"
+    assert write_json(str(path), {"teams": {"montréal": 1300}})
+    assert json.loads(path.read_text()) == {"teams": {"montréal": 1300}}
+    # compact, no temp files left behind
+    assert b", " not in path.read_bytes()
+    assert os.listdir(tmp_path) == ["latest_elos.json"]
+
+
+def test_write_bytes_skips_unchanged(tmp_path):
+    path = str(tmp_path / "out.json")
+    assert write_bytes(path, b"[1]")
+    modified = os.stat(path).st_mtime_ns
+    assert not write_bytes(path, b"[1]")
+    assert os.stat(path).st_mtime_ns == modified
+    assert write_bytes(path, b"[2]")
+
+
+def test_write_bytes_compress(tmp_path):
+    path = str(tmp_path / "out.json")
+    write_bytes(path, b"[1]")
+    # the gzipped copy is made even when the file itself is unchanged
+    assert not write_bytes(path, b"[1]", compress=True)
+    with gzip.open(f"{path}.gz") as f:
+        assert f.read() == b"[1]"
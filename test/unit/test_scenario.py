@@ -0,0 +1,49 @@
+from datetime import date
+
+import pytest
+
+from elo_lib.scenario import ScenarioEngine
+from elo_lib.utils import calculate_elo, expected_result
+
+LATEST_ELOS = {"date": "2025-01-01", "teams": {"boston": 1290, "toronto": 1310}}
+UPCOMING = [
+    {"date": date(2025, 1, 3), "home": "toronto", "away": "boston", "venue": "", "type": "regular"}
+]
+
+
+def test_run():
+    engine = ScenarioEngine(LATEST_ELOS, UPCOMING)
+    result = engine.run([{"home": "Boston", "away": "Toronto", "home_score": 4, "away_score": 1}])
+
+    expected_home, expected_away = expected_result(1290, 1310)
+    elo_boston, elo_toronto = calculate_elo(1290, 1310, expected_home, expected_away, 4, 1)
+    assert result["elos"] == {"boston": elo_boston, "toronto": elo_toronto}
+    assert result["changes"]["boston"] == elo_boston - 1290
+    projection = result["projections"][0]["games"][0]
+    assert projection["elo_before_home"] == elo_toronto
+    assert projection["elo_before_away"] == elo_boston
+
+    # the latest elos are never changed
+    assert LATEST_ELOS["teams"] == {"boston": 1290, "toronto": 1310}
+
+
+def test_run_tie():
+    engine = ScenarioEngine(LATEST_ELOS, UPCOMING)
+    with pytest.raises(Exception, match="tie"):
+        engine.run([{"home": "boston", "away": "toronto", "home_score": 1, "away_score": 1}])
+
+
+def test_run_unknown_teams():
+    engine = ScenarioEngine(LATEST_ELOS, UPCOMING)
+    games = [
+        {"home": "Bostn", "away": "Toronto", "home_score": 4, "away_score": 1},
+        {"home": "Toronto", "away": "Ottawa", "home_score": 4, "away_score": 1},
+    ]
+    with pytest.raises(Exception, match="'Bostn', 'Ottawa'"):
+        engine.run(games)
+
+
+def test_run_team_plays_itself():
+    engine = ScenarioEngine(LATEST_ELOS, UPCOMING)
+    with pytest.raises(Exception, match="play itself"):
+        engine.run([{"home": "Boston", "away": "boston", "home_score": 4, "away_score": 1}])
@@ -0,0 +1,53 @@
+import json
+import os
+from types import SimpleNamespace
+
+import numpy as np
+
+from elo_lib.output import write_json
+from elo_lib.scorelines import MAX_MARGIN, handle, poisson_table, project_scorelines
+from elo_lib.utils import expected_result
+
+
+def test_poisson_table():
+    table = poisson_table()
+    assert table is poisson_table()
+    assert np.allclose(table.sum(axis=1), 1)
+    # expected goals of 2 is row 40
+    assert np.isclose(table[40, 1], 2 * np.exp(-2))
+
+
+def test_project_scorelines():
+    elos_home = np.array([1300, 1400, 1200])
+    elos_away = np.array([1300, 1250, 1350])
+    projection = project_scorelines(elos_home, elos_away, 2.8)
+
+    total = projection["win_home"] + projection["win_away"] + projection["overtime"]
+    assert np.allclose(total, 1)
+    assert np.allclose(projection["margins"][:, MAX_MARGIN], projection["overtime"])
+    assert projection["goals_home"][1] > projection["goals_away"][1]
+
+    # sharing overtime evenly gives about the same odds as elo
+    win_home = projection["win_home"] + projection["overtime"] / 2
+    expected_win_home, _ = expected_result(elos_home, elos_away)
+    assert np.allclose(win_home, expected_win_home, atol=0.03)
+
+
+def test_handle(tmp_path, make_fixtures):
+    league = SimpleNamespace(elos_output_path=str(tmp_path), projections_output_path=str(tmp_path))
+    fixtures, current_elo, _ = make_fixtures()
+    fixtures.save(os.path.join(tmp_path, "league_fixtures.npz"))
+    write_json(os.path.join(tmp_path, "latest_elos.json"), current_elo)
+    with open(handle(league)) as f:
+        games = json.load(f)
+    assert [(game["home_team"], game["away_team"]) for game in games] == [("boston", "toronto")]
+    assert np.isclose(games[0]["win_home"] + games[0]["win_away"] + games[0]["overtime"], 1)
+
+
+def test_handle_season_over(tmp_path, make_fixtures):
+    league = SimpleNamespace(elos_output_path=str(tmp_path), projections_output_path=str(tmp_path))
+    fixtures, current_elo, _ = make_fixtures(time=["Final"] * 4)
+    fixtures.save(os.path.join(tmp_path, "league_fixtures.npz"))
+    write_json(os.path.join(tmp_path, "latest_elos.json"), current_elo)
+    with open(handle(league)) as f:
+        assert json.load(f) == []
@@ -0,0 +1,58 @@
+import json
+import os
+from types import SimpleNamespace
+
+from elo_lib import season_stats
+from elo_lib.season_stats import calculate_season_stats, handle, season_fingerprints
+
+
+def season_fixtures(make_fixtures, home_scores):
+    fixtures, _, _ = make_fixtures(
+        time=["Final"] * 3, away_score=[1, 4, 2], home_score=home_scores, season=[2024] * 3
+    )
+    return fixtures
+
+
+def test_calculate_season_stats(make_fixtures):
+    stats = calculate_season_stats(season_fixtures(make_fixtures, [3, 2, 1]), [2024])
+    toronto = stats["2024"]["toronto"]
+    assert [toronto["wins"], toronto["losses"], toronto["ties"]] == [2, 1, 0]
+    assert [toronto["goals_for"], toronto["goals_against"]] == [8, 5]
+    assert toronto["start_elo"] == 1300
+    assert toronto["elo_change"] == toronto["end_elo"] - 1300
+    assert toronto["peak_elo"] >= toronto["end_elo"] >= toronto["trough_elo"]
+    assert toronto["start_rank"] == 1
+    assert toronto["end_rank"] == 1
+
+
+def test_season_fingerprints_change_with_results(make_fixtures):
+    before = season_fingerprints(season_fixtures(make_fixtures, [3, 2, 1]))
+    assert before == season_fingerprints(season_fixtures(make_fixtures, [3, 2, 1]))
+    assert before != season_fingerprints(season_fixtures(make_fixtures, [3, 2, 5]))
+
+
+def test_handle_only_recalculates_changed_seasons(tmp_path, make_fixtures, monkeypatch):
+    league = SimpleNamespace(elos_output_path=str(tmp_path))
+    fixtures, _, _ = make_fixtures()
+    fixtures.save(os.path.join(tmp_path, "league_fixtures.npz"))
+    with open(handle(league)) as f:
+        before = json.load(f)
+    assert list(before["seasons"]) == ["2024", "2025"]
+
+    recalculated = []
+    calculate = season_stats.calculate_season_stats
+
+    def record(fixtures, seasons):
+        recalculated.extend(seasons)
+        return calculate(fixtures, seasons)
+
+    monkeypatch.setattr(season_stats, "calculate_season_stats", record)
+    fixtures, _, _ = make_fixtures(
+        time=["Final"] * 4, away_team=["Boston", "Toronto", "Boston", "Ottawa"]
+    )
+    fixtures.save(os.path.join(tmp_path, "league_fixtures.npz"))
+    with open(handle(league)) as f:
+        after = json.load(f)
+    assert recalculated == [2025]
+    assert after["seasons"]["2024"] == before["seasons"]["2024"]
+    assert "ottawa" in after["seasons"]["2025"]
@@ -0,0 +1,39 @@
+from datetime import date
+
+from elo_lib.snapshot import RatingsSnapshot, write_snapshot
+
+
+def test_write_and_read(tmp_path):
+    path = str(tmp_path / "latest_elos.bin")
+    current_elo = {"date": "2025-01-01", "teams": {"montréal": 1310, "boston": 1287}}
+    assert write_snapshot(path, current_elo)
+
+    snapshot = RatingsSnapshot(path)
+    assert snapshot.version == 1
+    assert snapshot.date == date(2025, 1, 1)
+    assert list(snapshot.ratings) == [1310, 1287]
+    assert snapshot.rating("montréal") == 1310
+    # only teams with an elo are published
+    assert list(snapshot.team_ids) == ["montréal", "boston"]
+    # a view of the mapped file, not a copy
+    assert not snapshot.ratings.flags.owndata
+    assert not snapshot.ratings.flags.writeable
+
+
+def test_refresh(tmp_path):
+    path = str(tmp_path / "latest_elos.bin")
+    current_elo = {"date": "2025-01-01", "teams": {"boston": 1287}}
+    write_snapshot(path, current_elo)
+    snapshot = RatingsSnapshot(path)
+    old_ratings = snapshot.ratings
+
+    # same elos, nothing new to pick up
+    assert not write_snapshot(path, current_elo)
+    assert not snapshot.refresh()
+
+    current_elo = {"date": "2025-01-02", "teams": {"boston": 1295}}
+    assert write_snapshot(path, current_elo)
+    assert snapshot.refresh()
+    assert snapshot.version == 2
+    assert snapshot.rating("boston") == 1295
+    assert old_ratings[0] == 1287
@@ -0,0 +1,21 @@
+from elo_lib.store import ResultsStore
+
+
+def test_write_and_query(tmp_path, make_fixtures):
+    store = ResultsStore(str(tmp_path / "league.sqlite"))
+    fixtures, current_elo, expected_wins = make_fixtures(time=["Final", "7:00 pm", "7:00 pm"])
+    store.write(fixtures, current_elo, *expected_wins)
+
+    assert store.latest_elos() == current_elo
+    assert [game["home"] for game in store.unplayed()] == ["boston", "toronto"]
+    assert store.unplayed(1)[0]["date"].isoformat() == "2024-01-03"
+    assert store.team_played("boston", 2024)
+    assert not store.team_played("boston", 2025)
+
+    # a game finishing is upserted
+    fixtures, current_elo, expected_wins = make_fixtures(time=["Final", "Final", "7:00 pm"])
+    store.write(fixtures, current_elo, *expected_wins)
+    assert len(store.unplayed()) == 1
+    count = store.connection.execute("SELECT count(*) FROM game_elos").fetchone()[0]
+    assert count == 2
+    store.close()
@@ -0,0 +1,57 @@
+import pandas as pd
+import pytest
+
+from elo_lib.teams import TeamRegistry
+from elo_lib.utils import clean_name, clean_names
+
+TEAMS = {
+    "montréal": {"city": "Montréal", "name": "Victoire", "aliases": ["MTL"]},
+    "new_york": {"city": "New York", "name": "Sirens"},
+}
+
+
+def test_clean_names():
+    names = pd.Series([" New York ", "Montreal", "Boston"])
+    assert list(clean_names(names)) == [clean_name(name) for name in names]
+
+
+def test_encode_aliases():
+    registry = TeamRegistry(TEAMS)
+    names = pd.Series(["Montreal", "MTL", "New York Sirens", " New York ", "Montréal Victoire"])
+    assert list(registry.encode(names)) == [0, 0, 1, 1, 0]
+    assert registry.names == ["montréal", "new_york"]
+
+
+def test_unknown_teams_reported_together():
+    registry = TeamRegistry(TEAMS)
+    with pytest.raises(Exception, match="'Boston'.*'Ottawa'"):
+        registry.encode(pd.Series(["Ottawa", "Montreal", "Boston", "Ottawa"]))
+
+
+def test_missing_team_name():
+    registry = TeamRegistry()
+    with pytest.raises(Exception, match="Missing team names in rows: 1"):
+        registry.encode(pd.Series(["Boston", None, "Toronto"]))
+
+
+def test_cache(tmp_path):
+    registry = TeamRegistry()
+    registry.encode(pd.Series(["Toronto", "Boston"]))
+    registry.save_cache(tmp_path / "team_registry.json")
+
+    cached = TeamRegistry()
+    cached.load_cache(tmp_path / "team_registry.json")
+    assert cached.resolved == {"Toronto": "toronto", "Boston": "boston"}
+
+    # names that aren't in the data anymore don't get ids and are dropped from the cache
+    assert list(cached.encode(pd.Series(["Toronto", "Ottawa"]))) == [0, 1]
+    assert cached.names == ["toronto", "ottawa"]
+    cached.save_cache(tmp_path / "team_registry.json")
+    pruned = TeamRegistry()
+    pruned.load_cache(tmp_path / "team_registry.json")
+    assert pruned.resolved == {"Toronto": "toronto", "Ottawa": "ottawa"}
+
+    # a cache made with another config is ignored
+    other = TeamRegistry(TEAMS)
+    other.load_cache(tmp_path / "team_registry.json")
+    assert other.names == ["montréal", "new_york"]
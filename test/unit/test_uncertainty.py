@@ -0,0 +1,24 @@
+import numpy as np
+
+from elo_lib.uncertainty import bootstrap_elos, played_games, replay_batch
+
+
+def played_fixtures(make_fixtures):
+    fixtures, current_elo, _ = make_fixtures(
+        time=["Final"] * 4, away_team=["Boston", "Toronto", "Boston", "Montreal"]
+    )
+    return fixtures, current_elo
+
+
+def test_replay_batch_matches_calculate(make_fixtures):
+    fixtures, current_elo = played_fixtures(make_fixtures)
+    elos = replay_batch(played_games(fixtures), np.ones((3, len(fixtures)), dtype=np.int64))
+    for team, name in enumerate(fixtures.teams):
+        assert list(elos[:, team]) == [current_elo["teams"][name]] * 3
+
+
+def test_bootstrap_elos(make_fixtures):
+    fixtures, _ = played_fixtures(make_fixtures)
+    elos = bootstrap_elos(fixtures, replicas=25, workers=1, batch_size=10, seed=1)
+    assert elos.shape == (25, 3)
+    assert np.array_equal(elos, bootstrap_elos(fixtures, 25, workers=1, batch_size=10, seed=1))
@@ -0,0 +1,180 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from elo_lib.calculate_elo import handle as handle_calculate_elo
+from elo_lib.chart_data import handle as handle_chart_data
+from elo_lib.clean_seasons import handle as handle_clean_seasons
+from elo_lib.utils import League
+from elo_lib import watch as watch_module
+from elo_lib.watch import Watcher, new_finals, watch
+
+
+def game(game_id, day, home, away, home_score=None, away_score=None):
+    final = home_score is not None
+    return {
+        "game_id": game_id,
+        "date": "",
+        "home_team": "",
+        "game_status": "Final" if final else "7:00 pm EST",
+        "home_team_city": home,
+        "visiting_team_city": away,
+        "home_goal_count": str(home_score) if final else "0",
+        "visiting_goal_count": str(away_score) if final else "0",
+        "venue_name": f"{home} Arena",
+        "date_played": f"2025-01-{day:02d}",
+    }
+
+
+BEFORE = [
+    game("1", 1, "Boston", "Toronto", 3, 1),
+    game("2", 2, "Toronto", "Montreal", 2, 1),
+    game("3", 3, "Montreal", "Boston"),
+    game("4", 4, "Boston", "Montreal"),
+]
+AFTER = BEFORE[:2] + [
+    game("3", 3, "Montreal", "Boston", 4, 0),
+    game("4", 4, "Boston", "Montreal", 2, 3),
+]
+
+
+def make_league(root, url="http://localhost"):
+    for folder in ["seasons", "clean", "elos", "chart", "projections"]:
+        (root / folder).mkdir()
+    config = {
+        "output_path": str(root / "seasons"),
+        "clean_output_path": str(root / "clean"),
+        "elos_output_path": str(root / "elos"),
+        "chart_data_output_path": str(root / "chart"),
+        "projections_output_path": str(root / "projections"),
+        "seasons": {"5": {"type": "regular", "year": 2025}},
+        "url": url,
+        "url_contains_id": False,
+        "param_id": False,
+        "params": {},
+        "matches_path": [],
+    }
+    (root / "league.config").write_text(json.dumps(config))
+    return League(config=str(root / "league.config"))
+
+
+def calculate(league, matches):
+    with open(f"{league.output_path}/season_5.json", "w") as f:
+        json.dump(matches, f)
+    handle_clean_seasons(league)
+    handle_calculate_elo(league)
+    handle_chart_data(league)
+
+
+@pytest.fixture
+def feed():
+    """
+    Fake feed that serves AFTER, until `response` is changed.
+    """
+    response = {"status": 200, "body": AFTER}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(response["status"])
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(json.dumps(response["body"]).encode())
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/", response
+    server.shutdown()
+
+
+def test_new_finals():
+    assert [g["game_id"] for g in new_finals(BEFORE, AFTER)] == ["3", "4"]
+    assert new_finals(AFTER, AFTER) == []
+
+
+def test_watch_matches_full_calculate(tmp_path, feed):
+    (tmp_path / "watched").mkdir()
+    league = make_league(tmp_path / "watched", url=feed[0])
+    calculate(league, BEFORE)
+
+    asyncio.run(watch("5", league, interval=0, max_polls=2))
+
+    (tmp_path / "full").mkdir()
+    full_league = make_league(tmp_path / "full")
+    calculate(full_league, AFTER)
+
+    for path in ["elos/latest_elos.json", "chart/chartable_wphl_elos.json"]:
+        watched = json.loads((tmp_path / "watched" / path).read_text())
+        full = json.loads((tmp_path / "full" / path).read_text())
+        assert watched == full
+    with open(f"{league.projections_output_path}/game_projections.json") as f:
+        assert json.load(f) == []
+
+
+def test_failed_update_keeps_finals(tmp_path, monkeypatch):
+    league = make_league(tmp_path)
+    calculate(league, BEFORE)
+
+    def apply(self, fixtures, current_elo, games):
+        raise Exception("Unknown teams")
+
+    monkeypatch.setattr(Watcher, "apply", apply)
+    with pytest.raises(Exception, match="Unknown teams"):
+        Watcher("5", league).update(AFTER)
+    monkeypatch.undo()
+
+    # after a restart the games are still new
+    watcher = Watcher("5", league)
+    assert [g["game_id"] for g in new_finals(watcher.snapshot, AFTER)] == ["3", "4"]
+    watcher.update(AFTER)
+    assert new_finals(Watcher("5", league).snapshot, AFTER) == []
+
+
+def test_watch_skips_bad_responses(tmp_path, feed, capsys):
+    url, response = feed
+    league = make_league(tmp_path, url=url)
+    calculate(league, BEFORE)
+
+    response.update(status=500, body={"error": "down"})
+    asyncio.run(watch("5", league, interval=0, max_polls=1))
+    response.update(status=200, body={"error": "bad key"})
+    asyncio.run(watch("5", league, interval=0, max_polls=1))
+
+    output = capsys.readouterr().out
+    assert "Couldn't get season 5" in output
+    assert "Couldn't find the matches of season 5" in output
+    with open(f"{league.output_path}/season_5.json") as f:
+        assert json.load(f) == BEFORE
+
+
+def test_failed_update_is_retried(tmp_path, monkeypatch):
+    (tmp_path / "watched").mkdir()
+    league = make_league(tmp_path / "watched")
+    calculate(league, BEFORE)
+    watcher = Watcher("5", league)
+
+    # fails after the fixtures are saved, the watcher should still have the games to apply
+    def chart_data(league):
+        raise Exception("disk full")
+
+    monkeypatch.setattr(watch_module, "handle_chart_data", chart_data)
+    with pytest.raises(Exception, match="disk full"):
+        watcher.update(AFTER)
+    assert watcher.snapshot == BEFORE
+    assert watcher.fixtures.played.sum() == 2
+    monkeypatch.undo()
+    watcher.update(AFTER)
+
+    (tmp_path / "full").mkdir()
+    full_league = make_league(tmp_path / "full")
+    calculate(full_league, AFTER)
+    for path in ["elos/latest_elos.json", "chart/chartable_wphl_elos.json"]:
+        watched = json.loads((tmp_path / "watched" / path).read_text())
+        full = json.loads((tmp_path / "full" / path).read_text())
+        assert watched == full